@@ -5,11 +5,16 @@ IPGen - A flexible IP address generator supporting multiple input and output for
 __version__ = "0.1.0"
 
 from .core import IPGenerator
+from .wildcard import WildcardMask
+from .sparse import SubnetSweep
 from .parsers import (
     parse_csv,
     parse_excel,
     parse_json,
     parse_yaml,
+    parse_sql,
+    parse_file,
+    parse_many,
     parse_cidr,
     parse_range,
     parse_wildcard,
@@ -20,17 +25,26 @@ from .formatters import (
     to_excel,
     to_json,
     to_yaml,
+    to_sql,
+    to_npy,
+    to_arrow,
+    to_parquet,
     to_list,
-    to_dict
+    to_dict,
+    to_stream
 )
-from .gui import IPGenGUI, main as gui_main
 
 __all__ = [
     'IPGenerator',
+    'WildcardMask',
+    'SubnetSweep',
     'parse_csv',
     'parse_excel',
     'parse_json',
     'parse_yaml',
+    'parse_sql',
+    'parse_file',
+    'parse_many',
     'parse_cidr',
     'parse_range',
     'parse_wildcard',
@@ -39,8 +53,23 @@ __all__ = [
     'to_excel',
     'to_json',
     'to_yaml',
+    'to_sql',
+    'to_npy',
+    'to_arrow',
+    'to_parquet',
     'to_list',
     'to_dict',
+    'to_stream',
     'IPGenGUI',
     'gui_main'
-] 
\ No newline at end of file
+]
+
+def __getattr__(name):
+    # The GUI is imported on first use so that tkinter is not loaded by the CLI
+    if name == 'IPGenGUI':
+        from .gui import IPGenGUI
+        return IPGenGUI
+    if name == 'gui_main':
+        from .gui import main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,129 @@
+"""
+Command-line interface for streaming generated IP addresses to stdout.
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from .compression import COMPRESSIONS, wrap_output
+from .core import IPGenerator
+from .formatters import STREAM_FORMATS, to_stream
+from .parsers import add_lines, add_target, iter_parse_many
+
+# Size of the stdout buffer, large enough that every chunk is a single write
+BUFFER_SIZE = 1 << 20
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the ipgen command."""
+    parser = argparse.ArgumentParser(
+        prog='ipgen',
+        description='Generate IP addresses from targets and files and write them to stdout.'
+    )
+    parser.add_argument(
+        'targets', nargs='*',
+        help='CIDR, start-end range, single IP, input file, or "-" to read targets from stdin'
+    )
+    parser.add_argument(
+        '-i', '--input', action='append', default=[], metavar='FILE',
+        help='input file (CSV, Excel, JSON, YAML, or one target per line)'
+    )
+    parser.add_argument(
+        '-f', '--format', choices=STREAM_FORMATS, default='plain',
+        help='output format (default: plain); binary is packed big-endian, '
+             '4 bytes per IPv4 or 16 per IPv6 address, one version per stream'
+    )
+    parser.add_argument(
+        '-z', '--compress', choices=COMPRESSIONS,
+        help='compress the output stream'
+    )
+    parser.add_argument(
+        '--threads', type=int, metavar='N',
+        help='compress gzip output in independent blocks on N threads (requires -z gzip)'
+    )
+    parser.add_argument(
+        '--interleave', type=int, metavar='PREFIX',
+        help='round-robin the output across /PREFIX subnets (e.g. 24)'
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, metavar='N',
+        help='number of input files parsed at once (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--ip-column', default='ip_address',
+        help='column holding addresses in CSV/Excel files (default: ip_address)'
+    )
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the ipgen command."""
+    parser = build_parser()
+    # Targets may follow options, as in `ipgen -i a.json 10.0.0.1`
+    args = parser.parse_intermixed_args(argv)
+
+    if not args.targets and not args.input:
+        parser.error('no targets given')
+    if args.threads is not None:
+        if args.threads < 1:
+            parser.error('--threads must be positive')
+        if args.compress != 'gzip':
+            parser.error('--threads requires -z gzip')
+
+    # Files are parsed concurrently but merged in command-line order
+    files = [target for target in args.targets if target != '-' and os.path.isfile(target)]
+    loaded = iter_parse_many(files + args.input, args.jobs, args.ip_column)
+    
+    def merge_next(generator):
+        result, parsed = next(loaded)
+        if result.error is not None:
+            parser.error(f"{result.path}: {result.error}")
+        generator.merge(parsed)
+    
+    generator = IPGenerator()
+    try:
+        for target in args.targets:
+            if target == '-':
+                add_lines(generator, sys.stdin)
+            elif os.path.isfile(target):
+                merge_next(generator)
+            else:
+                add_target(generator, target)
+        for _ in args.input:
+            merge_next(generator)
+    except (ValueError, OSError, KeyError) as e:
+        parser.error(str(e))
+    finally:
+        loaded.close()
+
+    if args.format == 'binary':
+        versions = {version for version, _, _ in generator.iter_int_ranges()}
+        if len(versions) > 1:
+            parser.error('binary output holds one IP version; '
+                         'IPv4 and IPv6 addresses cannot be mixed')
+
+    source = generator
+    if args.interleave is not None:
+        try:
+            source = generator.interleave(args.interleave)
+            source.buckets()
+        except ValueError as e:
+            parser.error(str(e))
+
+    sys.stdout.flush()
+    out = open(sys.stdout.fileno(), 'wb', buffering=BUFFER_SIZE, closefd=False)
+    try:
+        writer = wrap_output(out, args.compress, args.threads)
+        to_stream(source, writer, args.format)
+        if writer is not out:
+            writer.close()
+        out.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `ipgen 10.0.0.0/8 | head`); silence the
+        # flush at interpreter exit as recommended by the signal docs.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
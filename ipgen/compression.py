@@ -0,0 +1,330 @@
+"""
+Compressed file streams for the exporters and parsers.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Callable, Optional, Union
+
+# Compression by file suffix when compression='infer'
+COMPRESSION_SUFFIXES = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.lzma': 'xz',
+}
+
+COMPRESSIONS = ('gzip', 'bz2', 'xz')
+
+# Suffixes pandas compresses CSV files for by itself. The CSV writers and
+# parse_csv hand such files to pandas; other formats reject them.
+PANDAS_SUFFIXES = frozenset({'.zip', '.zst', '.tar'})
+
+# zlib's default level: most of the size reduction of level 9 at a fraction of the time
+GZIP_LEVEL = 6
+
+# Uncompressed bytes per gzip member in parallel mode
+COMPRESS_BLOCK_SIZE = 1 << 20
+
+# Leading bytes of each compressed format, used to read files regardless of name
+_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+)
+
+def resolve_compression(filepath: Union[str, Path], compression: Optional[str] = 'infer') -> Optional[str]:
+    """Return 'gzip', 'bz2', 'xz' or None for writing `filepath`.
+
+    'infer' picks the compression from the file suffix; None writes the
+    file uncompressed whatever its name. 'lzma' is accepted for 'xz'.
+    Inferring from a PANDAS_SUFFIXES suffix raises ValueError.
+    """
+    if compression == 'infer':
+        suffix = Path(filepath).suffix.lower()
+        if suffix in PANDAS_SUFFIXES:
+            raise ValueError(f"{filepath}: {suffix} compression is only supported for CSV files; "
+                             f"use .gz, .bz2 or .xz, or pass compression=None")
+        return COMPRESSION_SUFFIXES.get(suffix)
+    if compression == 'lzma':
+        return 'xz'
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    return compression
+
+def pandas_compression(filepath: Union[str, Path], compression: Optional[str] = 'infer') -> bool:
+    """Whether pandas rather than open_output/open_input compresses the CSV file `filepath`."""
+    return compression == 'infer' and Path(filepath).suffix.lower() in PANDAS_SUFFIXES
+
+def strip_compression_suffix(filepath: Union[str, Path]) -> Path:
+    """Return `filepath` without a compression suffix, e.g. "ips.json" for "ips.json.gz"."""
+    path = Path(filepath)
+    if path.suffix.lower() in COMPRESSION_SUFFIXES or path.suffix.lower() in PANDAS_SUFFIXES:
+        return path.with_suffix('')
+    return path
+
+class ParallelGzipWriter(io.BufferedIOBase):
+    """Write a gzip stream compressed in blocks by a thread pool.
+
+    Data is cut into `block_size` blocks and each block is compressed as
+    an independent gzip member, as pigz does. zlib releases the GIL, so
+    blocks compress in parallel, and the members are written in order.
+    Any gzip reader decompresses the concatenated members as one stream.
+    The output is a little larger than serial gzip because each block
+    starts with an empty dictionary.
+
+    Closing the writer finishes the stream but leaves `stream` open.
+    """
+
+    def __init__(self, stream: IO[bytes], threads: int, level: int = GZIP_LEVEL,
+                 block_size: int = COMPRESS_BLOCK_SIZE):
+        if threads < 1:
+            raise ValueError("threads must be positive")
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        super().__init__()
+        self._stream = stream
+        self._level = level
+        self._block_size = block_size
+        self._threads = threads
+        self._pool = ThreadPoolExecutor(threads)
+        self._pending = deque()
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed file")
+        size = len(data)
+        self._buffer += data
+        block_size = self._block_size
+        if len(self._buffer) >= block_size:
+            view = memoryview(self._buffer)
+            whole = len(self._buffer) - len(self._buffer) % block_size
+            for first in range(0, whole, block_size):
+                self._submit(bytes(view[first:first + block_size]))
+            view.release()
+            del self._buffer[:whole]
+        return size
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(self._pool.submit(gzip.compress, block, self._level, mtime=0))
+        # Bound memory: wait for the oldest blocks once every thread is busy twice over
+        while len(self._pending) > 2 * self._threads:
+            self._stream.write(self._pending.popleft().result())
+
+    def flush(self) -> None:
+        """Write out blocks that have finished compressing.
+
+        Data short of a full block stays buffered until close, so flushing
+        does not produce undersized members.
+        """
+        while self._pending and self._pending[0].done():
+            self._stream.write(self._pending.popleft().result())
+        self._stream.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self._buffer or not self._pending:
+                # An empty stream still gets one member so it is valid gzip
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._stream.write(self._pending.popleft().result())
+            self._stream.flush()
+        finally:
+            self._pool.shutdown()
+            super().close()
+
+def wrap_output(stream: IO[bytes], compression: Optional[str], threads: Optional[int] = None,
+                level: Optional[int] = None) -> IO[bytes]:
+    """Return a binary writer compressing into `stream`, which it leaves open.
+
+    `threads` compresses gzip output with a ParallelGzipWriter; it is
+    ignored for bz2 and xz. Closing the writer finishes the compressed
+    stream without closing `stream`.
+    """
+    if compression is None:
+        return stream
+    compression = resolve_compression('', compression)
+    if compression == 'gzip':
+        level = GZIP_LEVEL if level is None else level
+        if threads:
+            return ParallelGzipWriter(stream, threads, level)
+        return gzip.GzipFile(fileobj=stream, mode='wb', compresslevel=level, mtime=0)
+    if compression == 'bz2':
+        return bz2.BZ2File(stream, 'wb', compresslevel=9 if level is None else level)
+    return lzma.LZMAFile(stream, 'wb', preset=level)
+
+class _ClosingWriter(io.BufferedIOBase):
+    """A compressed writer that also closes the file underneath it."""
+
+    def __init__(self, writer: IO[bytes], raw: IO[bytes]):
+        super().__init__()
+        self._writer = writer
+        self._raw = raw
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self._writer.write(data)
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            super().close()
+            self._writer.close()
+        finally:
+            self._raw.close()
+
+def open_output(filepath: Union[str, Path], mode: str = 'wb', compression: Optional[str] = 'infer',
+                threads: Optional[int] = None, level: Optional[int] = None) -> IO:
+    """Open `filepath` for writing, compressing as chosen by resolve_compression.
+
+    `mode` is 'wb' or 'w' (text). See wrap_output for `threads` and `level`.
+    """
+    compression = resolve_compression(filepath, compression)
+    if mode not in ('w', 'wb'):
+        raise ValueError(f"Unsupported mode: {mode}")
+    if compression is None:
+        return open(filepath, mode)
+
+    raw = open(filepath, 'wb')
+    try:
+        # The compressed writers leave the file object passed to them open
+        writer = _ClosingWriter(wrap_output(raw, compression, threads, level), raw)
+    except BaseException:
+        raw.close()
+        raise
+    return io.TextIOWrapper(writer) if mode == 'w' else writer
+
+def detect_compression(filepath: Union[str, Path]) -> Optional[str]:
+    """Return 'gzip', 'bz2', 'xz' or None from the first bytes of `filepath`."""
+    with open(filepath, 'rb') as f:
+        head = f.read(6)
+    for magic, compression in _MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+class _ProgressReader(io.RawIOBase):
+    """A raw file that calls `progress(bytes_read, file_size)` as it is read."""
+
+    def __init__(self, raw: IO[bytes], progress: Callable[[int, int], None]):
+        super().__init__()
+        self._raw = raw
+        self._progress = progress
+        self._size = os.fstat(raw.fileno()).st_size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self._raw.seekable()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._raw.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._raw.tell()
+
+    def readinto(self, buffer) -> int:
+        size = self._raw.readinto(buffer)
+        self._progress(self._raw.tell(), self._size)
+        return size
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            super().close()
+        finally:
+            self._raw.close()
+
+class _ClosingReader(io.BufferedIOBase):
+    """A decompressing reader that also closes the file underneath it."""
+
+    def __init__(self, reader: IO[bytes], raw: IO[bytes]):
+        super().__init__()
+        self._reader = reader
+        self._raw = raw
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self._reader.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._reader.read1(size)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            super().close()
+            self._reader.close()
+        finally:
+            self._raw.close()
+
+def open_input(filepath: Union[str, Path], mode: str = 'rb',
+               progress: Optional[Callable[[int, int], None]] = None) -> IO:
+    """Open `filepath` for reading, decompressing gzip, bz2 or xz transparently.
+
+    The compression is detected from the file contents, not its name.
+    Concatenated gzip members, as written by ParallelGzipWriter, read
+    back as one stream.
+
+    `progress` is called as ``progress(bytes_read, file_size)`` each time
+    a block of the file on disk is read, so compressed files report how
+    much of the compressed data has been consumed. An exception raised
+    by `progress` stops the read.
+
+    Uncompressed-looking files with a PANDAS_SUFFIXES suffix raise
+    ValueError, as only parse_csv reads them (through pandas).
+    """
+    if mode not in ('r', 'rb'):
+        raise ValueError(f"Unsupported mode: {mode}")
+    compression = detect_compression(filepath)
+    if compression is None and pandas_compression(filepath):
+        raise ValueError(f"{filepath}: {Path(filepath).suffix} files can only be read as CSV")
+    if progress is None:
+        if compression is None:
+            return open(filepath, mode)
+        # The compressed openers read bytes unless text is asked for explicitly
+        mode = 'rb' if mode == 'rb' else 'rt'
+        if compression == 'gzip':
+            return gzip.open(filepath, mode)
+        if compression == 'bz2':
+            return bz2.open(filepath, mode)
+        return lzma.open(filepath, mode)
+
+    raw = io.BufferedReader(_ProgressReader(open(filepath, 'rb', buffering=0), progress))
+    try:
+        if compression is None:
+            stream = raw
+        elif compression == 'gzip':
+            # The decompressing readers leave the file object passed to them open
+            stream = _ClosingReader(gzip.GzipFile(fileobj=raw, mode='rb'), raw)
+        elif compression == 'bz2':
+            stream = _ClosingReader(bz2.BZ2File(raw, 'rb'), raw)
+        else:
+            stream = _ClosingReader(lzma.LZMAFile(raw, 'rb'), raw)
+    except BaseException:
+        raw.close()
+        raise
+    return io.TextIOWrapper(stream) if mode == 'r' else stream
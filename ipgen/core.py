@@ -2,24 +2,300 @@
 Core IP address generation functionality.
 """
 import ipaddress
-from typing import Generator, List, Union, Dict, Any
+import numbers
+import socket
+from bisect import bisect_right
+from itertools import islice, repeat
+from typing import Generator, Iterator, List, Optional, Tuple, Union, Dict, Any
 from pathlib import Path
-import pandas as pd
 import json
-import yaml
+
+from .formatters import (
+    ADDRESS_CLASSES,
+    ARRAY_CHUNK_SIZE,
+    get_yaml_dumper,
+    iter_yaml_chunks,
+    to_arrow,
+    to_npy,
+    to_parquet,
+    to_sql,
+    to_stream
+)
+from .compression import open_output, pandas_compression, resolve_compression
+from .dispatch import BLOCK_SIZE, Dispatcher
+from .pipeline import Pipeline
+from .schedule import RoundRobin, Weight
+from .sparse import (
+    LOW_BYTE_HOSTS,
+    MAX_ADDRESSES,
+    MAX_RANGES,
+    SubnetSweep,
+    _merge_pairs,
+    eui64_hosts,
+    low_byte_hosts,
+    seed_ranges
+)
+from .wildcard import WildcardMask
+
+# Largest bucket contains_many will step through before using plain searchsorted
+MAX_BUCKET_STEPS = 64
+
+# Addresses converted at a time by add_ips; each chunk is coalesced into runs
+# before the next is read, so only the compact runs outlive it
+BULK_CHUNK_SIZE = 1 << 20
+
+# Pending add_ips runs are unioned into the merged ones once they number at
+# least merged / PENDING_RUNS_DIVISOR, so repeated small calls stay linear
+PENDING_RUNS_DIVISOR = 2
+
+def _addresses_to_ints(items: List[Any]) -> Tuple[Any, List[int]]:
+    """Convert address strings, objects or IPv4 integers to (IPv4 int64 array, IPv6 ints).
+    
+    All-IPv4 string input is packed by inet_pton and decoded in one
+    NumPy call; anything else falls back to ipaddress per item, and a
+    ValueError names the first item that is not an address.
+    """
+    import numpy as np
+    
+    try:
+        packed = b''.join(map(socket.inet_pton, repeat(socket.AF_INET), items))
+    except (OSError, TypeError):
+        pass
+    else:
+        return np.frombuffer(packed, dtype='>u4').astype(np.int64), []
+    
+    ipv4 = []
+    ipv6 = []
+    for item in items:
+        # Integral covers NumPy integer scalars as well as int
+        if isinstance(item, numbers.Integral):
+            ipv4.append(int(item))
+            continue
+        if isinstance(item, str):
+            address = ipaddress.ip_address(item)
+        elif isinstance(item, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+            address = item
+        else:
+            # Such as NaN for an empty cell in a CSV column
+            raise ValueError(f"{item!r} is not an IP address")
+        (ipv4 if address.version == 4 else ipv6).append(int(address))
+    return np.array(ipv4, dtype=np.int64), ipv6
+
+def _coalesce_ints(values) -> Tuple[Any, Any]:
+    """Sort and deduplicate non-empty IPv4 integers into (starts, ends) uint32 run arrays."""
+    import numpy as np
+    
+    if values.min() < 0 or values.max() > 0xFFFFFFFF:
+        raise ValueError("IPv4 integers must be between 0 and 2**32 - 1")
+    values = np.sort(values)
+    # Duplicates (a gap of 0) stay in the same run
+    breaks = np.flatnonzero(np.diff(values) > 1) + 1
+    starts = values[np.concatenate(([0], breaks))]
+    ends = values[np.concatenate((breaks, [len(values)])) - 1]
+    return starts.astype(np.uint32), ends.astype(np.uint32)
+
+def _union_runs(runs: List[Tuple[Any, Any]]) -> Tuple[Any, Any]:
+    """Merge (starts, ends) run arrays into one sorted, disjoint uint32 pair.
+    
+    Runs may come in any order; those that overlap or touch are joined in
+    one vectorized pass. A single pair is returned as is, so it must
+    already be sorted and disjoint.
+    """
+    import numpy as np
+    
+    if len(runs) == 1:
+        return runs[0]
+    starts = np.concatenate([s for s, _ in runs]).astype(np.int64)
+    ends = np.concatenate([e for _, e in runs]).astype(np.int64)
+    order = np.argsort(starts, kind='stable')
+    starts = starts[order]
+    # Furthest end reached so far; a start beyond it + 1 opens a new run
+    reach = np.maximum.accumulate(ends[order])
+    opens = np.ones(len(starts), dtype=bool)
+    opens[1:] = starts[1:] > reach[:-1] + 1
+    last = np.append(np.flatnonzero(opens)[1:] - 1, len(reach) - 1)
+    return starts[opens].astype(np.uint32), reach[last].astype(np.uint32)
+
+def _subtract_intervals(a_starts: List[int], a_ends: List[int],
+                        b_starts: List[int], b_ends: List[int]) -> Tuple[List[int], List[int]]:
+    """Return the parts of sorted, disjoint intervals `a` not covered by `b`.
+    
+    Both lists are walked once, so the cost is O(len(a) + len(b)).
+    """
+    starts = []
+    ends = []
+    j = 0
+    for start, end in zip(a_starts, a_ends):
+        # Skip intervals of b that end before this one starts
+        while j < len(b_starts) and b_ends[j] < start:
+            j += 1
+        k = j
+        while k < len(b_starts) and b_starts[k] <= end:
+            if b_starts[k] > start:
+                starts.append(start)
+                ends.append(b_starts[k] - 1)
+            start = max(start, b_ends[k] + 1)
+            if start > end:
+                break
+            k += 1
+        if start <= end:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
 
 class IPGenerator:
     """Main class for IP address generation and manipulation."""
     
     def __init__(self):
         self._ip_ranges = []
-        self._ip_addresses = set()
+        # Dict rather than set so single addresses keep their insertion order
+        self._ip_addresses = {}
+        # WildcardMask patterns whose free bits are not a single block, and
+        # SubnetSweep patterns over IPv6 prefixes too large to expand
+        self._patterns = []
+        # Sorted, disjoint (starts, ends) uint32 arrays of IPv4 runs from
+        # add_ips, or None; replaced by its union with _pending_runs
+        self._int_runs = None
+        # Coalesced run arrays from add_ips calls not yet unioned, and their total length
+        self._pending_runs = []
+        self._pending_count = 0
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle as plain integers, which is several times faster than address objects.
+        
+        This matters when generators are returned from worker processes.
+        """
+        versions = bytes(ip.version for ip in self._ip_addresses)
+        return {
+            'singles': [int(ip) for ip in self._ip_addresses],
+            # None when every single address is IPv4, the common case
+            'versions': versions if 6 in versions else None,
+            'ranges': [(start.version, int(start), int(end)) for start, end in self._ip_ranges],
+            'patterns': self._patterns,
+            'runs': self._merged_runs(),
+        }
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        if state['versions'] is None:
+            singles = map(ipaddress.IPv4Address, state['singles'])
+        else:
+            singles = map(lambda v, value: ADDRESS_CLASSES[v](value), state['versions'], state['singles'])
+        self._ip_addresses = dict.fromkeys(singles)
+        self._ip_ranges = [
+            (ADDRESS_CLASSES[version](start), ADDRESS_CLASSES[version](end))
+            for version, start, end in state['ranges']
+        ]
+        self._patterns = state['patterns']
+        self._int_runs = state['runs']
+        self._pending_runs = []
+        self._pending_count = 0
     
     def add_ip(self, ip: Union[str, ipaddress.IPv4Address, ipaddress.IPv6Address]) -> None:
         """Add a single IP address."""
         if isinstance(ip, str):
             ip = ipaddress.ip_address(ip)
-        self._ip_addresses.add(ip)
+        self._ip_addresses[ip] = None
+    
+    def add_ips(self, ips) -> None:
+        """Add many IP addresses at once.
+        
+        `ips` is an iterable of address strings or objects, a sequence of
+        IPv4 integers, or a NumPy array (1-D IPv4 integers or (n, 2) IPv6
+        halves as written by to_npy). IPv4 addresses are sorted,
+        deduplicated and kept as NumPy arrays of consecutive runs, so no
+        per-address objects are created; each call merges its runs with
+        those already added. IPv6 addresses are coalesced into ranges as well.
+        """
+        import numpy as np
+        
+        if isinstance(ips, np.ndarray) and ips.dtype.kind in 'iu':
+            if ips.ndim == 2:
+                self._add_ipv6_ints([int(high) << 64 | int(low) for high, low in ips.tolist()])
+            else:
+                self._add_ipv4_ints(ips)
+            return
+        
+        runs = []
+        ipv6 = []
+        ips = iter(ips)
+        while True:
+            chunk = list(islice(ips, BULK_CHUNK_SIZE))
+            if not chunk:
+                break
+            ipv4, chunk_ipv6 = _addresses_to_ints(chunk)
+            if len(ipv4):
+                runs.append(_coalesce_ints(ipv4))
+            ipv6.extend(chunk_ipv6)
+        self._add_ipv4_runs(runs)
+        self._add_ipv6_ints(ipv6)
+    
+    def _add_ipv4_ints(self, values) -> None:
+        """Add an array of IPv4 integers as runs."""
+        if len(values):
+            self._add_ipv4_runs([_coalesce_ints(values.astype('int64', copy=False))])
+    
+    def _add_ipv4_runs(self, runs: List[Tuple[Any, Any]]) -> None:
+        """Queue (starts, ends) run arrays for a union with the ones already added.
+        
+        The union runs once the queue reaches a fixed fraction of the merged
+        runs (or when the generator is read), so each run is re-sorted a
+        bounded number of times however many calls bring them in.
+        """
+        self._pending_runs.extend(runs)
+        self._pending_count += sum(len(starts) for starts, _ in runs)
+        merged = 0 if self._int_runs is None else len(self._int_runs[0])
+        if self._pending_runs and self._pending_count >= merged // PENDING_RUNS_DIVISOR:
+            self._merged_runs()
+    
+    def _merged_runs(self) -> Optional[Tuple[Any, Any]]:
+        """Union any queued add_ips runs and return the (starts, ends) pair, or None."""
+        if self._pending_runs:
+            runs = self._pending_runs
+            if self._int_runs is not None:
+                runs = [self._int_runs] + runs
+            self._int_runs = _union_runs(runs)
+            self._pending_runs = []
+            self._pending_count = 0
+        return self._int_runs
+    
+    def _add_ipv6_ints(self, values: List[int]) -> None:
+        """Add IPv6 integers as singles and ranges of consecutive values."""
+        values = sorted(set(values))
+        address = ipaddress.IPv6Address
+        i = 0
+        while i < len(values):
+            j = i
+            while j + 1 < len(values) and values[j + 1] == values[j] + 1:
+                j += 1
+            if i == j:
+                self._ip_addresses[address(values[i])] = None
+            else:
+                self._ip_ranges.append((address(values[i]), address(values[j])))
+            i = j + 1
+    
+    def _runs(self) -> List[Tuple[Any, Any]]:
+        """Return the IPv4 run arrays from add_ips as a list of zero or one (starts, ends) pair."""
+        runs = self._merged_runs()
+        return [] if runs is None else [runs]
+    
+    @classmethod
+    def from_ints(cls, values, version: int = 4) -> 'IPGenerator':
+        """Create a generator from a sequence of integer addresses; see add_ips."""
+        import numpy as np
+        
+        generator = cls()
+        if version == 4:
+            generator._add_ipv4_ints(np.asarray(values, dtype=np.int64))
+        else:
+            generator._add_ipv6_ints(list(values))
+        return generator
+    
+    @classmethod
+    def from_array(cls, array) -> 'IPGenerator':
+        """Create a generator from a NumPy array as written by to_npy; see add_ips."""
+        generator = cls()
+        generator.add_ips(array)
+        return generator
     
     def add_range(self, start_ip: str, end_ip: str) -> None:
         """Add a range of IP addresses."""
@@ -32,31 +308,296 @@ class IPGenerator:
         network = ipaddress.ip_network(cidr)
         self._ip_ranges.append((network[0], network[-1]))
     
-    def add_wildcard(self, ip: str, wildcard: str) -> None:
-        """Add IP addresses matching a wildcard pattern."""
-        # Convert wildcard to CIDR
-        parts = wildcard.split('.')
-        cidr = sum(1 for p in parts if p == '255')
-        network = ipaddress.ip_network(f"{ip}/{cidr}")
-        self._ip_ranges.append((network[0], network[-1]))
+    def add_wildcard(self, ip: str, wildcard: str, max_ranges: Optional[int] = MAX_RANGES) -> None:
+        """Add IP addresses matching a wildcard pattern.
+        
+        Set bits in `wildcard` may take any value, as in ACL masks such as
+        "0.0.0.255" or "0.0.255.0". Contiguous masks become a plain range;
+        others are kept as a WildcardMask rather than expanded. Masks that
+        split into more than `max_ranges` ranges raise ValueError.
+        """
+        pattern = WildcardMask(ip, wildcard, max_ranges)
+        if pattern.is_contiguous:
+            address = ADDRESS_CLASSES[pattern.version]
+            self._ip_ranges.append((pattern.address, address(pattern.base | pattern.free)))
+        else:
+            self._patterns.append(pattern)
+    
+    def _add_sweep(self, sweep: SubnetSweep) -> None:
+        """Store a sweep as a plain range when it is one, else as a pattern."""
+        if sweep.range_count == 1:
+            _, start, end = next(sweep.iter_int_ranges())
+            self._ip_ranges.append((ipaddress.IPv6Address(start), ipaddress.IPv6Address(end)))
+        elif sweep.range_count:
+            self._patterns.append(sweep)
+    
+    def add_subnet_sweep(self, network: str, hosts=LOW_BYTE_HOSTS, subnet_prefix: int = 64,
+                         max_addresses: Optional[int] = MAX_ADDRESSES,
+                         max_ranges: Optional[int] = MAX_RANGES) -> None:
+        """Add the same interface IDs in every /subnet_prefix of an IPv6 network.
+        
+        `hosts` lists (first, last) interface-ID ranges; see SubnetSweep.
+        Sweeps larger than `max_addresses` or `max_ranges` raise ValueError.
+        """
+        self._add_sweep(SubnetSweep(network, hosts, subnet_prefix, max_addresses, max_ranges))
+    
+    def add_low_byte_hosts(self, network: str, last: int = 0xFF, subnet_prefix: int = 64,
+                           max_addresses: Optional[int] = MAX_ADDRESSES,
+                           max_ranges: Optional[int] = MAX_RANGES) -> None:
+        """Add hosts ::1 to ::last in every /subnet_prefix of an IPv6 network."""
+        self._add_sweep(low_byte_hosts(network, last, subnet_prefix, max_addresses, max_ranges))
+    
+    def add_eui64(self, network: str, ouis, nics: Tuple[int, int] = (0, 0xFFFFFF),
+                  subnet_prefix: int = 64, max_addresses: Optional[int] = MAX_ADDRESSES,
+                  max_ranges: Optional[int] = MAX_RANGES) -> None:
+        """Add EUI-64 (SLAAC) addresses of the given vendor OUIs in an IPv6 network.
+        
+        See eui64_hosts; `nics` narrows the NIC-specific part of the MAC.
+        """
+        self._add_sweep(eui64_hosts(network, ouis, nics, subnet_prefix, max_addresses, max_ranges))
+    
+    def add_seed_neighbors(self, seeds, radius: int = 16, subnet_radius: int = 0,
+                           subnet_prefix: int = 64, max_addresses: Optional[int] = MAX_ADDRESSES,
+                           max_ranges: Optional[int] = MAX_RANGES) -> None:
+        """Add IPv6 addresses near known seed addresses as merged ranges; see seed_ranges."""
+        ranges = seed_ranges(seeds, radius, subnet_radius, subnet_prefix, max_addresses, max_ranges)
+        address = ipaddress.IPv6Address
+        self._ip_ranges.extend((address(start), address(end)) for start, end in ranges)
     
     def add_gateway_subnet(self, gateway: str, subnet_mask: str) -> None:
         """Add IP addresses based on gateway and subnet mask."""
         network = ipaddress.ip_network(f"{gateway}/{subnet_mask}")
         self._ip_ranges.append((network[0], network[-1]))
     
+    def merge(self, other: 'IPGenerator') -> None:
+        """Add all IP addresses and ranges from another generator."""
+        self._ip_addresses.update(other._ip_addresses)
+        self._ip_ranges.extend(other._ip_ranges)
+        self._patterns.extend(other._patterns)
+        self._add_ipv4_runs(other._runs())
+    
     def generate(self) -> Generator[Union[ipaddress.IPv4Address, ipaddress.IPv6Address], None, None]:
         """Generate all IP addresses as a generator."""
         # Add individual IPs
         for ip in self._ip_addresses:
             yield ip
         
+        # Add bulk-loaded IPs, which follow the individual ones
+        address = ipaddress.IPv4Address
+        for starts, ends in self._runs():
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                for value in range(start, end + 1):
+                    yield address(value)
+        
         # Add ranges
         for start, end in self._ip_ranges:
             current = start
             while current <= end:
                 yield current
                 current += 1
+        
+        # Add wildcard patterns and subnet sweeps
+        for pattern in self._patterns:
+            yield from pattern.generate()
+    
+    def iter_int_ranges(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield (version, start, end) integer tuples in generation order."""
+        for ip in self._ip_addresses:
+            value = int(ip)
+            yield ip.version, value, value
+        
+        for starts, ends in self._runs():
+            yield from zip(repeat(4), starts.tolist(), ends.tolist())
+        
+        for start, end in self._ip_ranges:
+            yield start.version, int(start), int(end)
+        
+        for pattern in self._patterns:
+            yield from pattern.iter_int_ranges()
+    
+    def interleave(self, prefix: Optional[int] = 24, prefix6: int = 64,
+                   weights: Optional[Weight] = None) -> RoundRobin:
+        """Round-robin the addresses across /prefix subnets (or input ranges if None).
+        
+        `weights` maps the first address of a bucket to how many addresses
+        it contributes per round. See RoundRobin.
+        """
+        return RoundRobin(self, prefix, prefix6, weights)
+    
+    def pipeline(self, version: int = 4, chunk_size: int = ARRAY_CHUNK_SIZE) -> Pipeline:
+        """Start a batch pipeline over the `version` addresses, skipping the others; see Pipeline."""
+        return Pipeline(self, version, chunk_size)
+    
+    def share(self, block_size: int = BLOCK_SIZE) -> Dispatcher:
+        """Put the addresses in shared memory for worker processes to claim in blocks.
+        
+        See Dispatcher. Use the result as a context manager in the creating
+        process so the shared block is freed afterwards.
+        """
+        return Dispatcher(self, block_size)
+    
+    def intervals(self, version: int = 4) -> Tuple[List[int], List[int]]:
+        """Return sorted, merged (starts, ends) integer lists for one IP version.
+        
+        Overlapping and adjacent ranges are combined, so the intervals are
+        disjoint and every address appears in exactly one of them.
+        """
+        merged = _merge_pairs(
+            (start, end) for v, start, end in self.iter_int_ranges()
+            if v == version and start <= end
+        )
+        return [start for start, _ in merged], [end for _, end in merged]
+    
+    @classmethod
+    def from_intervals(cls, intervals: Dict[int, Tuple[List[int], List[int]]]) -> 'IPGenerator':
+        """Create a generator from {version: (starts, ends)} integer intervals."""
+        generator = cls()
+        for version, (starts, ends) in intervals.items():
+            address = ADDRESS_CLASSES[version]
+            generator._ip_ranges.extend(
+                (address(start), address(end)) for start, end in zip(starts, ends)
+            )
+        return generator
+    
+    def count(self) -> int:
+        """Number of addresses generate() yields, computed without expanding ranges."""
+        ranges = sum(max(int(end) - int(start) + 1, 0) for start, end in self._ip_ranges)
+        patterns = sum(pattern.num_addresses for pattern in self._patterns)
+        runs = sum(
+            len(starts) + int(ends.sum(dtype='int64')) - int(starts.sum(dtype='int64'))
+            for starts, ends in self._runs()
+        )
+        return len(self._ip_addresses) + ranges + patterns + runs
+    
+    def diff(self, other: 'IPGenerator') -> Tuple['IPGenerator', 'IPGenerator']:
+        """Compare with an earlier generator, returning (added, removed).
+        
+        `added` holds addresses in this generator but not in `other` and
+        `removed` the reverse. Both are built from merged intervals with a
+        linear walk, so their count() is available before any expansion.
+        """
+        added = {}
+        removed = {}
+        for version in (4, 6):
+            mine = self.intervals(version)
+            theirs = other.intervals(version)
+            added[version] = _subtract_intervals(*mine, *theirs)
+            removed[version] = _subtract_intervals(*theirs, *mine)
+        return self.from_intervals(added), self.from_intervals(removed)
+    
+    def diff_snapshot(self, filepath: Union[str, Path],
+                      save: bool = True) -> Tuple['IPGenerator', 'IPGenerator']:
+        """Diff against the snapshot saved by the previous run, returning (added, removed).
+        
+        A missing snapshot counts as empty, so the first run adds everything.
+        With `save`, this generator's merged ranges replace the snapshot
+        afterwards (written to a temporary file first, then renamed).
+        """
+        from .parsers import parse_json
+        
+        filepath = Path(filepath)
+        previous = parse_json(filepath) if filepath.exists() else IPGenerator()
+        added, removed = self.diff(previous)
+        
+        if save:
+            snapshot = self.from_intervals({4: self.intervals(4), 6: self.intervals(6)})
+            temp_path = filepath.with_name(filepath.name + '.tmp')
+            snapshot.to_json(temp_path, compression=resolve_compression(filepath))
+            temp_path.replace(filepath)
+        return added, removed
+    
+    def contains_many(self, addresses, return_index: bool = False):
+        """Test many addresses for membership at once.
+        
+        `addresses` is a NumPy array of IPv4 integers, an (n, 2) uint64
+        array of IPv6 (high, low) halves as written by to_npy, or any
+        iterable (or NumPy string array) of address strings, objects or
+        IPv4 integers, including NumPy integer scalars. Returns a
+        boolean NumPy mask; with `return_index`, also returns for each
+        address the position of its interval in intervals(version), or -1.
+        """
+        import numpy as np
+        
+        if isinstance(addresses, np.ndarray) and addresses.dtype.kind in 'iu':
+            if addresses.ndim == 1:
+                return self._contains_ipv4(addresses.astype(np.int64, copy=False), return_index)
+            if addresses.ndim == 2 and addresses.shape[1] == 2:
+                values = [(high << 64) | low for high, low in addresses.tolist()]
+                return self._contains_bisect(values, [6] * len(values), return_index)
+        
+        # Such as a list, or a NumPy array of strings or objects
+        addresses = list(addresses)
+        ipv4, ipv6 = _addresses_to_ints(addresses)
+        if not ipv6:
+            return self._contains_ipv4(ipv4, return_index)
+        
+        # Mixed input keeps its order, so convert again item by item
+        values = []
+        versions = []
+        for address in addresses:
+            if isinstance(address, numbers.Integral):
+                values.append(int(address))
+                versions.append(4)
+            else:
+                if isinstance(address, str):
+                    address = ipaddress.ip_address(address)
+                values.append(int(address))
+                versions.append(address.version)
+        return self._contains_bisect(values, versions, return_index)
+    
+    def _contains_ipv4(self, values, return_index: bool):
+        """Vectorized membership of IPv4 integers over the sorted intervals.
+        
+        A plain searchsorted of unsorted queries is dominated by cache
+        misses, so the starts are first bucketed by their high bits (with
+        searchsorted) and each query only steps back within its bucket.
+        Heavily clustered starts fall back to plain searchsorted.
+        """
+        import numpy as np
+        
+        starts, ends = self.intervals(4)
+        starts = np.array(starts, dtype=np.int64)
+        ends = np.array(ends, dtype=np.int64)
+        if not len(starts):
+            mask = np.zeros(len(values), dtype=bool)
+            return (mask, np.full(len(values), -1, dtype=np.int64)) if return_index else mask
+        
+        bits = min(max(len(starts).bit_length() + 2, 8), 20)
+        shift = 32 - bits
+        # Index of the last interval starting in or before each bucket
+        table = np.searchsorted(starts >> shift, np.arange(1, (1 << bits) + 1), side='left') - 1
+        
+        if np.diff(table).max(initial=0) > MAX_BUCKET_STEPS:
+            index = np.searchsorted(starts, values, side='right') - 1
+        else:
+            index = table[np.clip(values >> shift, 0, (1 << bits) - 1)]
+            pending = np.nonzero(index >= 0)[0]
+            while len(pending):
+                pending = pending[starts[index[pending]] > values[pending]]
+                index[pending] -= 1
+                pending = pending[index[pending] >= 0]
+        
+        mask = (index >= 0) & (values <= ends[np.maximum(index, 0)])
+        if return_index:
+            return mask, np.where(mask, index, -1)
+        return mask
+    
+    def _contains_bisect(self, values: List[int], versions: List[int], return_index: bool):
+        """Membership for input containing IPv6, which does not fit NumPy integers."""
+        import numpy as np
+        
+        intervals = {4: self.intervals(4), 6: self.intervals(6)}
+        mask = np.zeros(len(values), dtype=bool)
+        index = np.full(len(values), -1, dtype=np.int64)
+        for i, (value, version) in enumerate(zip(values, versions)):
+            starts, ends = intervals[version]
+            j = bisect_right(starts, value) - 1
+            if j >= 0 and value <= ends[j]:
+                mask[i] = True
+                index[i] = j
+        if return_index:
+            return mask, index
+        return mask
     
     def to_list(self) -> List[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
         """Convert to list of IP addresses."""
@@ -64,29 +605,113 @@ class IPGenerator:
     
     def to_dict(self) -> Dict[str, List[str]]:
         """Convert to dictionary with string representations."""
-        return {
+        data = {
             'ip_addresses': [str(ip) for ip in self._ip_addresses],
             'ranges': [(str(start), str(end)) for start, end in self._ip_ranges]
         }
+        address = ipaddress.IPv4Address
+        for starts, ends in self._runs():
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                if start == end:
+                    data['ip_addresses'].append(str(address(start)))
+                else:
+                    data['ranges'].append((str(address(start)), str(address(end))))
+        wildcards = [p for p in self._patterns if isinstance(p, WildcardMask)]
+        if wildcards:
+            data['wildcards'] = [(str(p.address), str(p.wildcard)) for p in wildcards]
+        sweeps = [p for p in self._patterns if isinstance(p, SubnetSweep)]
+        if sweeps:
+            data['sweeps'] = [p.to_dict() for p in sweeps]
+        return data
     
-    def to_csv(self, filepath: Union[str, Path]) -> None:
-        """Save IP addresses to CSV file."""
+    def to_csv(self, filepath: Union[str, Path], compression: Optional[str] = 'infer',
+               threads: Optional[int] = None) -> None:
+        """Save IP addresses to CSV file, compressed as chosen by open_output.
+        
+        Names ending in .zip, .zst or .tar are compressed by pandas instead.
+        """
+        import pandas as pd
         df = pd.DataFrame({'ip_address': [str(ip) for ip in self.generate()]})
-        df.to_csv(filepath, index=False)
+        if pandas_compression(filepath, compression):
+            # pandas writes zip, zstd and tar files itself
+            df.to_csv(filepath, index=False)
+            return
+        with open_output(filepath, 'w', compression, threads) as f:
+            df.to_csv(f, index=False)
     
     def to_excel(self, filepath: Union[str, Path]) -> None:
         """Save IP addresses to Excel file."""
+        import pandas as pd
         df = pd.DataFrame({'ip_address': [str(ip) for ip in self.generate()]})
         df.to_excel(filepath, index=False)
     
-    def to_json(self, filepath: Union[str, Path]) -> None:
-        """Save IP addresses to JSON file."""
+    def to_stream(self, stream, output_format: str = "plain") -> None:
+        """Write IP addresses to a binary stream."""
+        return to_stream(self, stream, output_format)
+    
+    def to_sql(self, engine_or_url, table: str, ranges: bool = True) -> int:
+        """Save IP addresses or ranges to a database table, returning the rows written.
+        
+        Unlike the to_sql formatter, which writes a row per address unless
+        asked for ranges, this stores start/end ranges by default, as
+        to_json and to_yaml do; pass ranges=False for a row per address.
+        """
+        return to_sql(self, engine_or_url, table, ranges)
+    
+    def _array_version(self, version: Union[int, None]) -> int:
+        """Pick the IP version for the columnar exporters."""
+        if version is not None:
+            return version
+        versions = {v for v, _, _ in self.iter_int_ranges()}
+        if len(versions) > 1:
+            raise ValueError("Generator mixes IPv4 and IPv6; pass version=4 or version=6 "
+                             "to export only that version")
+        return versions.pop() if versions else 4
+    
+    def to_npy(self, filepath: Union[str, Path], version: Union[int, None] = None,
+               compression: Optional[str] = 'infer', threads: Optional[int] = None) -> int:
+        """Save IP addresses as a NumPy .npy integer array.
+        
+        With an explicit `version`, addresses of the other version are left out.
+        """
+        return to_npy(self, filepath, self._array_version(version), compression, threads,
+                      skip_other=version is not None)
+    
+    def to_arrow(self, filepath: Union[str, Path], version: Union[int, None] = None) -> int:
+        """Save IP addresses as an Arrow IPC file (requires pyarrow); see to_npy for `version`."""
+        return to_arrow(self, filepath, self._array_version(version), skip_other=version is not None)
+    
+    def to_parquet(self, filepath: Union[str, Path], version: Union[int, None] = None) -> int:
+        """Save IP addresses as a Parquet file (requires pyarrow); see to_npy for `version`."""
+        return to_parquet(self, filepath, self._array_version(version), skip_other=version is not None)
+    
+    def to_json(self, filepath: Union[str, Path], compression: Optional[str] = 'infer',
+                threads: Optional[int] = None) -> None:
+        """Save IP addresses to JSON file, compressed as chosen by open_output."""
         data = self.to_dict()
-        with open(filepath, 'w') as f:
+        with open_output(filepath, 'w', compression, threads) as f:
             json.dump(data, f, indent=2)
     
-    def to_yaml(self, filepath: Union[str, Path]) -> None:
-        """Save IP addresses to YAML file."""
+    def to_yaml(self, filepath: Union[str, Path], expand: bool = False,
+                compression: Optional[str] = 'infer', threads: Optional[int] = None) -> None:
+        """Save IP addresses to YAML file.
+        
+        By default (`expand=False`) ranges are kept as start/end pairs.
+        With expand=True every address is streamed out as its own list
+        item, which the to_yaml formatter does by default. The file is
+        compressed as chosen by open_output.
+        """
+        if expand:
+            with open_output(filepath, 'wb', compression, threads) as f:
+                for chunk in iter_yaml_chunks(self):
+                    f.write(chunk)
+            return
+        
+        import yaml
         data = self.to_dict()
-        with open(filepath, 'w') as f:
-            yaml.dump(data, f) 
\ No newline at end of file
+        # Safe dumpers only represent lists, not tuples
+        data['ranges'] = [list(r) for r in data['ranges']]
+        if 'wildcards' in data:
+            data['wildcards'] = [list(w) for w in data['wildcards']]
+        with open_output(filepath, 'w', compression, threads) as f:
+            yaml.dump(data, f, Dumper=get_yaml_dumper())
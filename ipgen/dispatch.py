@@ -0,0 +1,202 @@
+"""
+Hand out a generator's addresses to worker processes through shared memory.
+"""
+import ipaddress
+import multiprocessing
+from typing import Iterator, List, Optional, Tuple, Union
+
+from .formatters import ADDRESS_CLASSES
+
+# Addresses handed out per claim
+BLOCK_SIZE = 4096
+
+# int64 slots at the start of the shared block: run count, total addresses
+_HEADER_SLOTS = 2
+
+def _coalesce_runs(int_ranges) -> List[Tuple[int, int, int]]:
+    """Collect (version, start, end) runs, joining runs that continue the previous one."""
+    runs = []
+    for version, start, end in int_ranges:
+        if start > end:
+            continue
+        if runs and runs[-1][0] == version and runs[-1][2] + 1 == start:
+            runs[-1] = (version, runs[-1][1], end)
+        else:
+            runs.append((version, start, end))
+    return runs
+
+class Dispatcher:
+    """Share a generator's addresses among processes, claimed a block at a time.
+
+    The runs from ``source.iter_int_ranges()`` are stored once in a
+    ``multiprocessing.shared_memory`` block as NumPy arrays: the index of
+    each run's first address, its start as two 64-bit halves, and its IP
+    version. Addresses are numbered in generation order, and ``claim``
+    takes the next `block_size` numbers from a shared cursor. A worker
+    only pays one lock round trip per block, and fast workers just claim
+    more blocks.
+
+    Pass the dispatcher to worker processes when starting them (as a
+    Process argument or Pool initarg); the cursor can only be shared by
+    inheritance. The creating process should ``unlink`` it when done, or
+    use it as a context manager.
+    """
+
+    def __init__(self, source, block_size: int = BLOCK_SIZE, context=None):
+        import numpy as np
+        from multiprocessing import shared_memory
+
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        runs = _coalesce_runs(source.iter_int_ranges())
+        total = sum(end - start + 1 for _, start, end in runs)
+        if total >= 1 << 63:
+            raise ValueError("Too many addresses to number with 64-bit indexes")
+
+        count = len(runs)
+        self._shm = shared_memory.SharedMemory(create=True, size=self._shm_size(count))
+        self._owner = True
+        self.block_size = block_size
+        self._cursor = (context or multiprocessing).Value('q', 0)
+        self._bind(count)
+
+        self._header[:] = (count, total)
+        sizes = np.fromiter((end - start + 1 for _, start, end in runs), dtype=np.int64, count=count)
+        self._offsets[0] = 0
+        np.cumsum(sizes, out=self._offsets[1:])
+        self._high[:] = [start >> 64 for _, start, _ in runs]
+        self._low[:] = [start & 0xFFFFFFFFFFFFFFFF for _, start, _ in runs]
+        self._versions[:] = [version for version, _, _ in runs]
+
+    @staticmethod
+    def _shm_size(count: int) -> int:
+        """Bytes needed for `count` runs: header, offsets, start halves, versions."""
+        return 8 * (_HEADER_SLOTS + (count + 1) + 2 * count) + count
+
+    def _bind(self, count: Optional[int] = None) -> None:
+        """Create the NumPy views onto the shared block."""
+        import numpy as np
+
+        buf = self._shm.buf
+        self._header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=buf)
+        if count is None:
+            count = int(self._header[0])
+        offset = 8 * _HEADER_SLOTS
+        self._offsets = np.ndarray((count + 1,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += 8 * (count + 1)
+        self._high = np.ndarray((count,), dtype=np.uint64, buffer=buf, offset=offset)
+        offset += 8 * count
+        self._low = np.ndarray((count,), dtype=np.uint64, buffer=buf, offset=offset)
+        offset += 8 * count
+        self._versions = np.ndarray((count,), dtype=np.uint8, buffer=buf, offset=offset)
+
+    def __getstate__(self):
+        return {'name': self._shm.name, 'block_size': self.block_size, 'cursor': self._cursor}
+
+    def __setstate__(self, state) -> None:
+        from multiprocessing import shared_memory
+
+        self._shm = shared_memory.SharedMemory(name=state['name'])
+        self._owner = False
+        self.block_size = state['block_size']
+        self._cursor = state['cursor']
+        self._bind()
+
+    def __enter__(self) -> 'Dispatcher':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def close(self) -> None:
+        """Detach from the shared block in this process."""
+        # The block cannot be closed while NumPy views still point into it
+        self._header = self._offsets = self._high = self._low = self._versions = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Free the shared block; call once, from the creating process."""
+        self._shm.unlink()
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block."""
+        return self._shm.name
+
+    def count(self) -> int:
+        """Number of addresses to hand out."""
+        return int(self._header[1])
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def claim(self) -> Optional[Tuple[int, int]]:
+        """Claim the next block, returning its (first, stop) indexes, or None when all are taken."""
+        total = self.count()
+        with self._cursor.get_lock():
+            first = self._cursor.value
+            if first >= total:
+                return None
+            self._cursor.value = first + self.block_size
+        return first, min(first + self.block_size, total)
+
+    def reset(self) -> None:
+        """Start handing out blocks from the beginning again."""
+        with self._cursor.get_lock():
+            self._cursor.value = 0
+
+    def blocks(self) -> Iterator[Tuple[int, int]]:
+        """Claim blocks until none are left."""
+        while True:
+            block = self.claim()
+            if block is None:
+                return
+            yield block
+
+    def block_ranges(self, first: int, stop: int) -> Iterator[Tuple[int, int, int]]:
+        """Yield (version, start, end) runs for the addresses numbered first..stop-1."""
+        import numpy as np
+
+        offsets = self._offsets
+        stop = min(stop, self.count())
+        i = int(np.searchsorted(offsets, first, side='right')) - 1
+        while first < stop:
+            run_stop = int(offsets[i + 1])
+            start = (int(self._high[i]) << 64 | int(self._low[i])) + first - int(offsets[i])
+            take = min(stop, run_stop) - first
+            yield int(self._versions[i]), start, start + take - 1
+            first += take
+            i += 1
+
+    def iter_int_ranges(self) -> Iterator[Tuple[int, int, int]]:
+        """Claim blocks until none are left, yielding their (version, start, end) runs.
+
+        This makes a dispatcher usable with the formatters, each worker
+        writing out only the blocks it claimed.
+        """
+        for first, stop in self.blocks():
+            yield from self.block_ranges(first, stop)
+
+    def generate(self) -> Iterator[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+        """Claim blocks until none are left, yielding their addresses."""
+        for version, start, end in self.iter_int_ranges():
+            address = ADDRESS_CLASSES[version]
+            for value in range(start, end + 1):
+                yield address(value)
+
+    def iter_arrays(self, chunk_size: Optional[int] = None):
+        """Claim blocks until none are left, yielding each as a uint32 array of IPv4 addresses.
+
+        Arrays are always one block long; `chunk_size` is accepted so the
+        dispatcher can be passed to to_npy and the other array exporters.
+        """
+        import numpy as np
+
+        if (self._versions != 4).any():
+            raise ValueError("iter_arrays only supports IPv4 addresses")
+        for first, stop in self.blocks():
+            index = np.arange(first, stop, dtype=np.int64)
+            run = np.searchsorted(self._offsets, index, side='right') - 1
+            yield (self._low[run].astype(np.int64) + index - self._offsets[run]).astype(np.uint32)
@@ -1,13 +1,253 @@
 """
 Output formatters for writing IP addresses to various formats.
 """
-import pandas as pd
 import json
-import yaml
-from typing import List, Dict, Any, Union
+import shutil
+import struct
+import tempfile
+from itertools import chain, islice
+from typing import Iterator, List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
 import ipaddress
 
+from .compression import COMPRESS_BLOCK_SIZE, open_output, pandas_compression, resolve_compression
+
+ADDRESS_CLASSES = {4: ipaddress.IPv4Address, 6: ipaddress.IPv6Address}
+
+# Output formats understood by to_stream
+STREAM_FORMATS = ('plain', 'cidr', 'jsonl', 'binary')
+
+# Number of addresses formatted per chunk outside of whole IPv4 blocks
+CHUNK_SIZE = 65536
+
+# Rows sent to the database per executemany call
+SQL_BATCH_SIZE = 10000
+
+# Addresses per array chunk for the columnar exporters
+ARRAY_CHUNK_SIZE = 1 << 20
+
+_MASK_64 = (1 << 64) - 1
+
+_ipv4_tails = None
+
+def _get_ipv4_tails() -> List[bytes]:
+    """Return the encoded "c.d" endings of all 65536 addresses in a /16."""
+    global _ipv4_tails
+    if _ipv4_tails is None:
+        _ipv4_tails = [f"{c}.{d}".encode() for c in range(256) for d in range(256)]
+    return _ipv4_tails
+
+_ipv4_line_tables = {}
+
+def _get_ipv4_line_tables(prefix: bytes, suffix: bytes) -> Tuple[Any, Any]:
+    """Return NumPy `S` arrays of `prefix + "a.b."` heads and `"c.d" + suffix` tails.
+
+    Both are indexed by 16 bits of an address and padded with NUL bytes.
+    """
+    key = (prefix, suffix)
+    if key not in _ipv4_line_tables:
+        import numpy as np
+
+        heads = [prefix + f"{a}.{b}.".encode() for a in range(256) for b in range(256)]
+        tails = [tail + suffix for tail in _get_ipv4_tails()]
+        _ipv4_line_tables[key] = (np.array(heads, dtype='S'), np.array(tails, dtype='S'))
+    return _ipv4_line_tables[key]
+
+def _int_ranges(ips) -> Iterator[Tuple[int, int, int]]:
+    """Yield (version, start, end) tuples from an IPGenerator or an iterable of IPs."""
+    if hasattr(ips, 'iter_int_ranges'):
+        yield from ips.iter_int_ranges()
+        return
+
+    for ip in ips:
+        if isinstance(ip, str):
+            ip = ipaddress.ip_address(ip)
+        value = int(ip)
+        yield ip.version, value, value
+
+def _ipv4_arrays(ips):
+    """Return IPv4 NumPy chunks for sources that lay them out themselves, else None."""
+    if not hasattr(ips, 'iter_arrays'):
+        return None
+    arrays = ips.iter_arrays()
+    try:
+        first = next(arrays)
+    except StopIteration:
+        return iter(())
+    except ValueError:
+        # The source also holds IPv6; use its ranges instead
+        return None
+    return chain([first], arrays)
+
+def iter_text_chunks(ips, prefix: bytes = b"", suffix: bytes = b"\n") -> Iterator[bytes]:
+    """Yield encoded chunks with one `prefix + ip + suffix` line per address.
+
+    IPv4 ranges are formatted a /16 at a time by joining precomputed
+    address endings, so no per-address objects are created. IPv4 arrays,
+    such as a RoundRobin's chunks, gather each line's NUL-padded head and
+    tail from lookup tables into one record array and strip the padding.
+    """
+    tails = _get_ipv4_tails()
+    pending = []
+
+    arrays = _ipv4_arrays(ips)
+    if arrays is not None:
+        import numpy as np
+
+        heads, tail_table = _get_ipv4_line_tables(prefix, suffix)
+        line = np.dtype([('head', heads.dtype), ('tail', tail_table.dtype)])
+        for array in arrays:
+            lines = np.empty(len(array), dtype=line)
+            lines['head'] = heads[array >> 16]
+            lines['tail'] = tail_table[array & 0xFFFF]
+            yield lines.tobytes().translate(None, b"\0")
+        return
+
+    for version, start, end in _int_ranges(ips):
+        if version == 4 and end - start >= 255:
+            if pending:
+                yield b"".join(pending)
+                pending = []
+
+            while start <= end:
+                high = start >> 16
+                stop = min(end, high << 16 | 0xFFFF)
+                head = prefix + f"{high >> 8}.{high & 0xFF}.".encode()
+                yield head + (suffix + head).join(tails[start & 0xFFFF:(stop & 0xFFFF) + 1]) + suffix
+                start = stop + 1
+            continue
+
+        for value in range(start, end + 1):
+            if version == 4:
+                text = f"{value >> 24}.{value >> 16 & 0xFF}.".encode() + tails[value & 0xFFFF]
+            else:
+                text = str(ipaddress.IPv6Address(value)).encode()
+            pending.append(prefix + text + suffix)
+            if len(pending) >= CHUNK_SIZE:
+                yield b"".join(pending)
+                pending = []
+
+    if pending:
+        yield b"".join(pending)
+
+def iter_yaml_chunks(ips) -> Iterator[bytes]:
+    """Yield an `ip_addresses` YAML document with one list item per address.
+
+    Addresses are quoted so IPv6 values can never resolve to YAML numbers.
+    """
+    chunks = iter_text_chunks(ips, b"- '", b"'\n")
+    first = next(chunks, None)
+    if first is None:
+        yield b"ip_addresses: []\n"
+        return
+
+    yield b"ip_addresses:\n" + first
+    yield from chunks
+
+def _coalesce(int_ranges) -> Iterator[Tuple[int, int, int]]:
+    """Merge (version, start, end) tuples that directly follow one another."""
+    run = None
+    for version, start, end in int_ranges:
+        if run and run[0] == version and run[2] + 1 == start:
+            run[2] = end
+            continue
+        if run:
+            yield tuple(run)
+        run = [version, start, end]
+    if run:
+        yield tuple(run)
+
+def coalesce_ranges(ips) -> Dict[str, List]:
+    """Collapse runs of consecutive addresses into `ranges` start/end pairs.
+
+    The result has the `ip_addresses`/`ranges` layout read by parse_yaml
+    and parse_json.
+    """
+    singles = []
+    ranges = []
+    for version, start, end in _coalesce(_int_ranges(ips)):
+        cls = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+        if start == end:
+            singles.append(str(cls(start)))
+        else:
+            ranges.append([str(cls(start)), str(cls(end))])
+
+    return {'ip_addresses': singles, 'ranges': ranges}
+
+def get_yaml_dumper():
+    """Return libyaml's CSafeDumper when available, else the pure-Python SafeDumper."""
+    import yaml
+    return getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+def iter_binary_chunks(ips) -> Iterator[bytes]:
+    """Yield chunks of packed big-endian addresses (4 bytes IPv4, 16 bytes IPv6).
+
+    The records are not framed, so a stream holds one IP version only;
+    meeting the other raises ValueError.
+    """
+    arrays = _ipv4_arrays(ips)
+    if arrays is not None:
+        for array in arrays:
+            yield array.astype('>u4').tobytes()
+        return
+
+    pending = []
+    pending_count = 0
+    stream_version = None
+
+    for version, start, end in _int_ranges(ips):
+        if version != stream_version:
+            if stream_version is not None:
+                raise ValueError("Binary output cannot mix IPv4 and IPv6 addresses")
+            stream_version = version
+        while start <= end:
+            stop = min(end, start + CHUNK_SIZE - 1)
+            if version == 4:
+                pending.append(struct.pack(f">{stop - start + 1}I", *range(start, stop + 1)))
+            else:
+                pending.extend(value.to_bytes(16, 'big') for value in range(start, stop + 1))
+            pending_count += stop - start + 1
+            start = stop + 1
+
+            if pending_count >= CHUNK_SIZE:
+                yield b"".join(pending)
+                pending = []
+                pending_count = 0
+
+    if pending:
+        yield b"".join(pending)
+
+def iter_cidr_chunks(ips) -> Iterator[bytes]:
+    """Yield chunks of newline-separated CIDR blocks covering each range."""
+    pending = []
+
+    for version, start, end in _int_ranges(ips):
+        cls = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+        for network in ipaddress.summarize_address_range(cls(start), cls(end)):
+            pending.append(f"{network}\n")
+        if len(pending) >= CHUNK_SIZE:
+            yield "".join(pending).encode()
+            pending = []
+
+    if pending:
+        yield "".join(pending).encode()
+
+def to_stream(ips, stream, output_format: str = 'plain') -> None:
+    """Write IP addresses to a binary stream in one of STREAM_FORMATS."""
+    if output_format == 'plain':
+        chunks = iter_text_chunks(ips)
+    elif output_format == 'jsonl':
+        chunks = iter_text_chunks(ips, b'"', b'"\n')
+    elif output_format == 'cidr':
+        chunks = iter_cidr_chunks(ips)
+    elif output_format == 'binary':
+        chunks = iter_binary_chunks(ips)
+    else:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    for chunk in chunks:
+        stream.write(chunk)
+
 def to_list(ips) -> List[str]:
     """Convert IP generator to a list of IP strings."""
     return [str(ip) for ip in ips]
@@ -18,24 +258,306 @@ def to_dict(ips) -> Dict[str, List[str]]:
         'ip_addresses': [str(ip) for ip in ips]
     }
 
-def to_csv(ips, filepath: Union[str, Path]) -> None:
-    """Save IP addresses to a CSV file."""
+def to_csv(ips, filepath: Union[str, Path], compression: Optional[str] = 'infer',
+           threads: Optional[int] = None) -> None:
+    """Save IP addresses to a CSV file, optionally compressed (see open_output).
+
+    Names ending in .zip, .zst or .tar are compressed by pandas instead.
+    """
+    import pandas as pd
     df = pd.DataFrame({'ip_address': [str(ip) for ip in ips]})
-    df.to_csv(filepath, index=False)
+    if pandas_compression(filepath, compression):
+        # pandas writes zip, zstd and tar files itself
+        df.to_csv(filepath, index=False)
+        return
+    with open_output(filepath, 'w', compression, threads) as f:
+        df.to_csv(f, index=False)
 
 def to_excel(ips, filepath: Union[str, Path]) -> None:
     """Save IP addresses to an Excel file."""
+    import pandas as pd
     df = pd.DataFrame({'ip_address': [str(ip) for ip in ips]})
     df.to_excel(filepath, index=False)
 
-def to_json(ips, filepath: Union[str, Path]) -> None:
-    """Save IP addresses to a JSON file."""
+def to_json(ips, filepath: Union[str, Path], compression: Optional[str] = 'infer',
+            threads: Optional[int] = None) -> None:
+    """Save IP addresses to a JSON file, optionally compressed (see open_output)."""
     data = {'ip_addresses': [str(ip) for ip in ips]}
-    with open(filepath, 'w') as f:
+    with open_output(filepath, 'w', compression, threads) as f:
         json.dump(data, f, indent=2)
 
-def to_yaml(ips, filepath: Union[str, Path]) -> None:
-    """Save IP addresses to a YAML file."""
-    data = {'ip_addresses': [str(ip) for ip in ips]}
-    with open(filepath, 'w') as f:
-        yaml.dump(data, f) 
\ No newline at end of file
+def to_yaml(ips, filepath: Union[str, Path], expand: bool = True,
+            compression: Optional[str] = 'infer', threads: Optional[int] = None) -> None:
+    """Save IP addresses to a YAML file.
+
+    By default (`expand=True`) every address is streamed out as its own
+    list item. With expand=False, runs of consecutive addresses are
+    written as `ranges` pairs instead, which is far smaller and faster to
+    load; IPGenerator.to_yaml does this by default. The file is
+    compressed as chosen by open_output.
+    """
+    if expand:
+        with open_output(filepath, 'wb', compression, threads) as f:
+            for chunk in iter_yaml_chunks(ips):
+                f.write(chunk)
+        return
+
+    import yaml
+    with open_output(filepath, 'w', compression, threads) as f:
+        yaml.dump(coalesce_ranges(ips), f, Dumper=get_yaml_dumper())
+
+def sql_table(name: str, metadata, ranges: bool = False):
+    """Define the table written by to_sql.
+
+    Address tables have `version`, `ip_address` and `ip_int` columns; range
+    tables have `version`, `start_ip`, `end_ip`, `start_int` and `end_int`.
+    The indexed integer columns are filled for IPv4 only, as 128-bit IPv6
+    values do not fit a portable integer type.
+    """
+    from sqlalchemy import BigInteger, Column, Integer, SmallInteger, String, Table
+
+    if ranges:
+        columns = [
+            Column('start_ip', String(39), nullable=False),
+            Column('end_ip', String(39), nullable=False),
+            Column('start_int', BigInteger, index=True),
+            Column('end_int', BigInteger, index=True),
+        ]
+    else:
+        columns = [
+            Column('ip_address', String(39), nullable=False),
+            Column('ip_int', BigInteger, index=True),
+        ]
+    return Table(
+        name, metadata,
+        Column('id', Integer, primary_key=True),
+        Column('version', SmallInteger, nullable=False),
+        *columns
+    )
+
+def _iter_sql_rows(ips, ranges: bool) -> Iterator[Dict[str, Any]]:
+    """Yield to_sql row dicts, one per address or per run of addresses."""
+    if ranges:
+        for version, start, end in _coalesce(_int_ranges(ips)):
+            cls = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+            yield {
+                'version': version,
+                'start_ip': str(cls(start)),
+                'end_ip': str(cls(end)),
+                'start_int': start if version == 4 else None,
+                'end_int': end if version == 4 else None,
+            }
+        return
+
+    for version, start, end in _int_ranges(ips):
+        for value in range(start, end + 1):
+            if version == 4:
+                text = f"{value >> 24}.{value >> 16 & 0xFF}.{value >> 8 & 0xFF}.{value & 0xFF}"
+                yield {'version': 4, 'ip_address': text, 'ip_int': value}
+            else:
+                yield {'version': 6, 'ip_address': str(ipaddress.IPv6Address(value)), 'ip_int': None}
+
+def to_sql(ips, engine_or_url, table: str, ranges: bool = False,
+           batch_size: int = SQL_BATCH_SIZE) -> int:
+    """Insert IP addresses into a database table through SQLAlchemy.
+
+    Rows are streamed in executemany batches inside a single transaction,
+    so a failed export leaves the table untouched. The table is created
+    if it does not exist (see sql_table). With `ranges`, consecutive
+    addresses are stored as one start/end row. Returns the rows inserted.
+
+    This writes a row per address by default, like the other address
+    stream formatters; IPGenerator.to_sql defaults to ranges=True instead.
+    """
+    from sqlalchemy import MetaData, create_engine, insert
+
+    engine = create_engine(engine_or_url) if isinstance(engine_or_url, str) else engine_or_url
+    metadata = MetaData()
+    sql = sql_table(table, metadata, ranges)
+    rows = _iter_sql_rows(ips, ranges)
+    count = 0
+
+    try:
+        with engine.begin() as conn:
+            metadata.create_all(conn)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                conn.execute(insert(sql), batch)
+                count += len(batch)
+    finally:
+        if engine is not engine_or_url:
+            engine.dispose()
+    return count
+
+def _ipv6_pairs(start: int, count: int):
+    """Return `count` consecutive IPv6 addresses from `start` as an (n, 2) uint64 array."""
+    import numpy as np
+
+    pairs = np.empty((count, 2), dtype=np.uint64)
+    base_lo = np.uint64(start & _MASK_64)
+    lo = np.arange(count, dtype=np.uint64) + base_lo  # wraps past 2**64
+    pairs[:, 0] = start >> 64
+    pairs[:, 0] += lo < base_lo
+    pairs[:, 1] = lo
+    return pairs
+
+def iter_array_chunks(ips, version: int = 4, chunk_size: int = ARRAY_CHUNK_SIZE,
+                      skip_other: bool = False):
+    """Yield NumPy arrays of integer addresses without creating address strings.
+
+    IPv4 chunks are 1-D uint32 arrays; IPv6 chunks are (n, 2) uint64 arrays
+    of (high, low) halves. Addresses of the other version raise ValueError,
+    or are left out with `skip_other`.
+    """
+    import numpy as np
+
+    # Schedules such as RoundRobin can lay out IPv4 arrays themselves
+    if version == 4 and hasattr(ips, 'iter_arrays'):
+        arrays = ips.iter_arrays(chunk_size)
+        if not skip_other:
+            yield from arrays
+            return
+        try:
+            first = next(arrays)
+        except StopIteration:
+            return
+        except ValueError:
+            # The source also holds IPv6; filter its ranges below instead
+            arrays = None
+        if arrays is not None:
+            yield first
+            yield from arrays
+            return
+
+    pending = []
+    for other, start, end in _int_ranges(ips):
+        if other != version:
+            if skip_other:
+                continue
+            raise ValueError(f"Cannot write IPv{other} address into an IPv{version} array")
+
+        if start == end:
+            pending.append(start)
+            if len(pending) >= chunk_size:
+                yield _singles_array(pending, version)
+                pending = []
+            continue
+
+        if pending:
+            yield _singles_array(pending, version)
+            pending = []
+        while start <= end:
+            count = min(end - start + 1, chunk_size)
+            if version == 4:
+                yield np.arange(start, start + count, dtype=np.uint32)
+            else:
+                yield _ipv6_pairs(start, count)
+            start += count
+
+    if pending:
+        yield _singles_array(pending, version)
+
+def _singles_array(values: List[int], version: int):
+    """Convert a list of integer addresses to an array chunk."""
+    import numpy as np
+
+    if version == 4:
+        return np.array(values, dtype=np.uint32)
+    return np.array([(value >> 64, value & _MASK_64) for value in values], dtype=np.uint64)
+
+def _write_npy(f, ips, version: int, skip_other: bool) -> int:
+    """Write a .npy array to the seekable binary file `f`, returning the count."""
+    import numpy as np
+
+    dtype = np.dtype(np.uint32 if version == 4 else np.uint64)
+    header = {
+        'descr': np.lib.format.dtype_to_descr(dtype),
+        'fortran_order': False,
+        'shape': (0,) if version == 4 else (0, 2),
+    }
+    count = 0
+    np.lib.format.write_array_header_1_0(f, header)
+    data_offset = f.tell()
+    for chunk in iter_array_chunks(ips, version, skip_other=skip_other):
+        # Sources such as pipelines may yield other integer dtypes
+        f.write(chunk.astype(dtype, copy=False).tobytes())
+        count += len(chunk)
+
+    # The header is padded so the final length can be written in place
+    header['shape'] = (count,) if version == 4 else (count, 2)
+    f.seek(0)
+    np.lib.format.write_array_header_1_0(f, header)
+    if f.tell() != data_offset:
+        raise RuntimeError("NumPy header size changed while writing; file is corrupt")
+    return count
+
+def to_npy(ips, filepath: Union[str, Path], version: int = 4,
+           compression: Optional[str] = 'infer', threads: Optional[int] = None,
+           skip_other: bool = False) -> int:
+    """Save IP addresses as a NumPy .npy array, returning the count written.
+
+    IPv4 is stored as uint32 and IPv6 as (n, 2) uint64 (high, low), so the
+    file can be opened with ``numpy.load(path, mmap_mode='r')``. Chunks are
+    written as they are generated and the header is patched at the end.
+    A compressed file (see open_output) is loaded from
+    ``numpy.load(open_input(path))`` instead. Addresses of the other IP
+    version raise ValueError unless `skip_other` leaves them out.
+    """
+    if resolve_compression(filepath, compression) is None:
+        with open(filepath, 'wb') as f:
+            return _write_npy(f, ips, version, skip_other)
+
+    # A compressed stream cannot seek back to the header, so spool the array first
+    with tempfile.TemporaryFile() as spool:
+        count = _write_npy(spool, ips, version, skip_other)
+        spool.seek(0)
+        with open_output(filepath, 'wb', compression, threads) as f:
+            shutil.copyfileobj(spool, f, COMPRESS_BLOCK_SIZE)
+    return count
+
+def _arrow_batches(ips, version: int, skip_other: bool = False):
+    """Return the Arrow schema and an iterator of record batches."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Arrow and Parquet export require pyarrow (pip install pyarrow)") from None
+
+    if version == 4:
+        schema = pa.schema([('ip', pa.uint32())])
+        batches = (
+            pa.record_batch([pa.array(chunk)], schema=schema)
+            for chunk in iter_array_chunks(ips, 4, skip_other=skip_other)
+        )
+    else:
+        schema = pa.schema([('ip_hi', pa.uint64()), ('ip_lo', pa.uint64())])
+        batches = (
+            pa.record_batch([pa.array(chunk[:, 0]), pa.array(chunk[:, 1])], schema=schema)
+            for chunk in iter_array_chunks(ips, 6, skip_other=skip_other)
+        )
+    return schema, batches
+
+def to_arrow(ips, filepath: Union[str, Path], version: int = 4, skip_other: bool = False) -> int:
+    """Save IP addresses as an Arrow IPC (Feather v2) file of integer columns."""
+    schema, batches = _arrow_batches(ips, version, skip_other)
+    import pyarrow as pa
+
+    count = 0
+    with pa.OSFile(str(filepath), 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+def to_parquet(ips, filepath: Union[str, Path], version: int = 4, skip_other: bool = False) -> int:
+    """Save IP addresses as a Parquet file of integer columns, one row group per chunk."""
+    schema, batches = _arrow_batches(ips, version, skip_other)
+    import pyarrow.parquet as pq
+
+    count = 0
+    with pq.ParquetWriter(str(filepath), schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
@@ -2,14 +2,21 @@
 GUI application for testing the IP generator.
 """
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox
+import tkinter.font as tkfont
 from pathlib import Path
+from bisect import bisect_left, bisect_right
+import ipaddress
+from itertools import chain, islice
 import json
-import yaml
-from typing import Optional
 import os
+import queue
+import threading
+import time
+from typing import Optional
 
-from .core import IPGenerator
+from .core import IPGenerator, _union_runs
+from .formatters import to_csv, to_excel
 from .parsers import (
     parse_csv,
     parse_excel,
@@ -20,6 +27,489 @@ from .parsers import (
     parse_wildcard,
     parse_gateway_subnet
 )
+from .sparse import _merge_pairs
+
+# How often the Tk main loop polls a running background task
+POLL_INTERVAL_MS = 100
+
+# Number of addresses or ranges processed between progress reports
+PROGRESS_EVERY = 65536
+
+class TaskCancelled(Exception):
+    """Raised inside a background task when the user cancels it."""
+
+class BackgroundTask:
+    """Run a function on a worker thread and hand its outcome back to Tk.
+
+    The function is called as ``func(task, *args)`` and should call
+    ``task.progress(done, total)`` regularly; this raises TaskCancelled once
+    the user has pressed Cancel. Tk widgets are never touched from the
+    worker: the GUI polls ``progress_state()`` and ``outcome()`` from
+    ``root.after`` callbacks instead.
+    """
+    
+    def __init__(self, description, func, *args):
+        self.description = description
+        self.started = time.monotonic()
+        self.done = 0
+        self.total = 0
+        self.on_done = None
+        self._cancel_event = threading.Event()
+        self._outcome = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(func, args), daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def cancel(self):
+        self._cancel_event.set()
+    
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+    
+    def progress(self, done, total):
+        """Record progress from the worker thread."""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+        self.done = done
+        self.total = total
+    
+    def progress_state(self):
+        """Return (fraction, eta_seconds), either of which may be None."""
+        done, total = self.done, self.total
+        if not total:
+            return None, None
+        fraction = min(done / total, 1.0)
+        if not done:
+            return fraction, None
+        elapsed = time.monotonic() - self.started
+        return fraction, elapsed * (total - done) / done
+    
+    def outcome(self):
+        """Return ('done', result), ('error', exc), ('cancelled', None) or None while running."""
+        try:
+            return self._outcome.get_nowait()
+        except queue.Empty:
+            return None
+    
+    def _run(self, func, args):
+        try:
+            result = func(self, *args)
+        except TaskCancelled:
+            self._outcome.put(('cancelled', None))
+        except Exception as e:
+            self._outcome.put(('error', e))
+        else:
+            self._outcome.put(('done', result))
+
+def track_progress(task, ips, total):
+    """Yield from `ips`, reporting progress to `task` as it goes."""
+    for done, ip in enumerate(ips):
+        if done % PROGRESS_EVERY == 0:
+            task.progress(done, total)
+        yield ip
+
+def load_task(task, parser, filepath, generator, summary):
+    """Parse an input file and merge it into `generator` on the worker thread.
+    
+    The parser reports how much of the file it has read, so the load can
+    be cancelled part way. Returns the number of loaded addresses that
+    were already present.
+    """
+    new_generator = parser(filepath, progress=task.progress)
+    # Last chance to cancel; once merged the file stays loaded
+    task.progress(0, 0)
+    generator.merge(new_generator)
+    return summary.sync(generator)
+
+def export_task(task, generator, output_type, filename, total):
+    """Write the generator to `filename`, removing the partial file if cancelled.
+    
+    JSON and YAML files store ranges and patterns rather than every address,
+    so they are written in one go and cannot be cancelled (see EXPORT_CANCELLABLE).
+    """
+    try:
+        if output_type == "CSV File":
+            to_csv(track_progress(task, generator.generate(), total), filename)
+        elif output_type == "Excel File":
+            to_excel(track_progress(task, generator.generate(), total), filename)
+        elif output_type == "JSON File":
+            generator.to_json(filename)
+        elif output_type == "YAML File":
+            generator.to_yaml(filename)
+    except TaskCancelled:
+        if os.path.exists(filename):
+            os.remove(filename)
+        raise
+    return filename
+
+# Output types whose export_task reports progress and honours Cancel
+EXPORT_CANCELLABLE = frozenset({"CSV File", "Excel File"})
+
+def format_eta(seconds):
+    """Format a number of seconds as H:MM:SS."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+class GeneratorSummary:
+    """Count, merged range list and overlap check, kept up to date per add.
+    
+    Each IP version keeps sorted, disjoint start/end lists. A sync that
+    brings a single new range bisects for its neighbours and coalesces the
+    ones it touches. Larger syncs sort the k new ranges and merge them with
+    the n existing ones in one pass, O(k log k + n), which is O(log k + n/k)
+    per range rather than a list splice for each.
+    """
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self, generator=None):
+        """Forget everything and start tracking `generator`."""
+        self._generator = generator
+        self._singles_seen = 0
+        self._runs_seen = None
+        self._ranges_seen = 0
+        self._patterns_seen = 0
+        self._starts = {4: [], 6: []}
+        self._ends = {4: [], 6: []}
+        self.count = 0
+        self.unique_count = 0
+    
+    @property
+    def range_count(self):
+        """Number of disjoint ranges covering all added addresses."""
+        return len(self._starts[4]) + len(self._starts[6])
+    
+    def ranges(self):
+        """Return the merged ranges as (start, end) address pairs, IPv4 first."""
+        return [
+            (cls(start), cls(end))
+            for version, cls in ((4, ipaddress.IPv4Address), (6, ipaddress.IPv6Address))
+            for start, end in zip(self._starts[version], self._ends[version])
+        ]
+    
+    def sync(self, generator):
+        """Add what was appended to `generator` since the last sync.
+        
+        Returns how many of the new addresses were already covered.
+        """
+        if generator is not self._generator:
+            self.reset(generator)
+        
+        overlap = 0
+        # New (start, end) ranges per version, merged in one pass below
+        pending = {4: [], 6: []}
+        singles = generator._ip_addresses
+        if len(singles) == self._singles_seen + 1:
+            new_singles = [next(reversed(singles))]
+        else:
+            new_singles = islice(singles, self._singles_seen, None)
+        for ip in new_singles:
+            value = int(ip)
+            pending[ip.version].append((value, value))
+        self._singles_seen = len(singles)
+        
+        runs = generator._merged_runs()
+        if runs is not self._runs_seen:
+            # add_ips replaces the runs with a superset, so the part already
+            # seen comes back as overlap and is taken out again
+            seen = 0
+            if self._runs_seen is not None:
+                starts, ends = self._runs_seen
+                seen = len(starts) + int(ends.sum(dtype='int64')) - int(starts.sum(dtype='int64'))
+            overlap += self.add_runs(*runs) - seen
+            self.count -= seen
+            self._runs_seen = runs
+        
+        ranges = generator._ip_ranges
+        for start, end in ranges[self._ranges_seen:]:
+            pending[start.version].append((int(start), int(end)))
+        self._ranges_seen = len(ranges)
+        
+        patterns = generator._patterns
+        for pattern in patterns[self._patterns_seen:]:
+            for version, start, end in pattern.iter_int_ranges():
+                pending[version].append((start, end))
+        self._patterns_seen = len(patterns)
+        
+        for version, pairs in pending.items():
+            if len(pairs) == 1:
+                overlap += self.add(version, *pairs[0])
+            elif pairs:
+                overlap += self.add_many(version, pairs)
+        return overlap
+    
+    def add(self, version, start, end):
+        """Add one integer range and return how many of its addresses overlapped."""
+        if end < start:
+            return 0
+        starts = self._starts[version]
+        ends = self._ends[version]
+        
+        # Existing ranges that overlap or touch [start, end]
+        first = bisect_left(ends, start - 1)
+        last = bisect_right(starts, end + 1)
+        overlap = sum(
+            max(min(end, ends[i]) - max(start, starts[i]) + 1, 0)
+            for i in range(first, last)
+        )
+        if first < last:
+            starts[first:last] = [min(start, starts[first])]
+            ends[first:last] = [max(end, ends[last - 1])]
+        else:
+            starts.insert(first, start)
+            ends.insert(first, end)
+        
+        self.count += end - start + 1
+        self.unique_count += end - start + 1 - overlap
+        return overlap
+    
+    def add_many(self, version, pairs):
+        """Add (start, end) integer ranges in one merge; see add for the return value.
+        
+        IPv4 goes through the vectorized add_runs. IPv6 values do not fit
+        NumPy integers, so they are sorted and merged in Python instead.
+        """
+        pairs = [(start, end) for start, end in pairs if start <= end]
+        if not pairs:
+            return 0
+        if version == 4:
+            import numpy as np
+            
+            starts, ends = zip(*pairs)
+            return self.add_runs(np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64))
+        
+        # The existing ranges are already in order, so the sort merges them with the new ones
+        merged = _merge_pairs(chain(zip(self._starts[6], self._ends[6]), pairs))
+        added = sum(end - start + 1 for start, end in pairs)
+        return self._store(6, added, [start for start, _ in merged], [end for _, end in merged])
+    
+    def add_runs(self, starts, ends):
+        """Add IPv4 start/end arrays, such as the runs from add_ips, in one vectorized merge.
+        
+        Returns how many of their addresses overlapped.
+        """
+        import numpy as np
+        
+        if not len(starts):
+            return 0
+        old = (np.array(self._starts[4], dtype=np.int64), np.array(self._ends[4], dtype=np.int64))
+        merged_starts, merged_ends = _union_runs([old, (starts, ends)])
+        added = len(starts) + int(ends.sum(dtype=np.int64)) - int(starts.sum(dtype=np.int64))
+        return self._store(4, added, merged_starts.tolist(), merged_ends.tolist())
+    
+    def _store(self, version, added, starts, ends):
+        """Replace the ranges of `version` with merged `starts`/`ends` after adding `added` addresses.
+        
+        Returns how many of the added addresses overlapped.
+        """
+        def size(starts, ends):
+            return sum(ends) - sum(starts) + len(starts)
+        
+        overlap = size(self._starts[version], self._ends[version]) + added - size(starts, ends)
+        self._starts[version] = starts
+        self._ends[version] = ends
+        self.count += added
+        self.unique_count += added - overlap
+        return overlap
+
+class PreviewIndex:
+    """Random access by position into a generator's output order.
+    
+    Mirrors generate(): single addresses first, in insertion order, then
+    the bulk-loaded runs, each range and each wildcard pattern. Runs,
+    ranges and patterns are stored with the number of addresses before
+    them in their section, so finding a position is a bisect and
+    fetching n rows is O(n).
+    """
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self, generator=None):
+        """Forget everything and start tracking `generator`."""
+        self._generator = generator
+        self._singles = []
+        # The add_ips runs last seen and their (starts, offsets, sizes) int64 arrays
+        self._runs = None
+        self._run_arrays = None
+        self._run_count = 0
+        self._range_starts = []
+        self._range_sizes = []
+        self._range_offsets = []
+        self._range_count = 0
+        self._patterns = []
+        self._pattern_offsets = []
+        self._pattern_count = 0
+    
+    def size(self):
+        """Number of rows, which may be far beyond what len() can return."""
+        return len(self._singles) + self._run_count + self._range_count + self._pattern_count
+    
+    def sync(self, generator):
+        """Pick up addresses and ranges added to `generator` since the last sync."""
+        singles = generator._ip_addresses
+        runs = generator._merged_runs()
+        ranges = generator._ip_ranges
+        patterns = generator._patterns
+        if (generator is not self._generator
+                or len(singles) < len(self._singles)
+                or len(ranges) < len(self._range_starts)
+                or len(patterns) < len(self._patterns)):
+            self.reset(generator)
+        
+        added = len(singles) - len(self._singles)
+        if added == 1:
+            self._singles.append(next(reversed(singles)))
+        elif added:
+            self._singles.extend(islice(singles, len(self._singles), None))
+        
+        # add_ips replaces the runs rather than appending, so rebuild them;
+        # range and pattern offsets are relative to the end of the runs
+        if runs is not self._runs:
+            self._runs = runs
+            self._run_arrays = None
+            self._run_count = 0
+            if runs is not None:
+                starts = runs[0].astype('int64')
+                sizes = runs[1].astype('int64') - starts + 1
+                self._run_arrays = (starts, sizes.cumsum() - sizes, sizes)
+                self._run_count = int(sizes.sum())
+        
+        for start, end in ranges[len(self._range_starts):]:
+            size = max(int(end) - int(start) + 1, 0)
+            self._range_starts.append(start)
+            self._range_sizes.append(size)
+            self._range_offsets.append(self._range_count)
+            self._range_count += size
+        
+        for pattern in patterns[len(self._patterns):]:
+            self._patterns.append(pattern)
+            self._pattern_offsets.append(self._pattern_count)
+            self._pattern_count += pattern.num_addresses
+    
+    def rows(self, position, count):
+        """Return up to `count` address strings starting at `position`."""
+        import numpy as np
+        
+        rows = [str(ip) for ip in self._singles[position:position + count]]
+        position = max(position - len(self._singles), 0)
+        
+        if self._run_arrays is not None:
+            starts, offsets, sizes = self._run_arrays
+            k = int(np.searchsorted(offsets, position, side='right')) - 1
+            while len(rows) < count and k < len(starts):
+                offset = position - int(offsets[k])
+                if offset >= sizes[k]:
+                    # Past the end of the runs section
+                    break
+                take = min(int(sizes[k]) - offset, count - len(rows))
+                start = int(starts[k]) + offset
+                rows.extend(str(ipaddress.IPv4Address(v)) for v in range(start, start + take))
+                position += take
+                k += 1
+        
+        # Range offsets count from the end of the runs
+        position = max(position - self._run_count, 0)
+        i = bisect_right(self._range_offsets, position) - 1
+        while len(rows) < count and 0 <= i < len(self._range_starts):
+            offset = position - self._range_offsets[i]
+            if offset >= self._range_sizes[i]:
+                # Past the end of the ranges section
+                break
+            take = min(self._range_sizes[i] - offset, count - len(rows))
+            start = self._range_starts[i]
+            rows.extend(str(start + k) for k in range(offset, offset + take))
+            position += take
+            i += 1
+        
+        # Pattern offsets count from the end of the ranges
+        position = max(position - self._range_count, 0)
+        i = bisect_right(self._pattern_offsets, position) - 1
+        while len(rows) < count and 0 <= i < len(self._patterns):
+            pattern = self._patterns[i]
+            offset = position - self._pattern_offsets[i]
+            take = min(pattern.num_addresses - offset, count - len(rows))
+            rows.extend(str(pattern[k]) for k in range(offset, offset + take))
+            position += take
+            i += 1
+        return rows
+
+class VirtualListView(ttk.Frame):
+    """List of generated addresses that only renders the visible rows."""
+    
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.index = PreviewIndex()
+        self.top = 0
+        
+        self.listbox = tk.Listbox(self, activestyle='none', exportselection=False)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.line_height = tkfont.Font(font=self.listbox.cget('font')).metrics('linespace') + 1
+        
+        self.listbox.bind('<Configure>', lambda event: self.refresh())
+        self.listbox.bind('<MouseWheel>', lambda event: self.scroll_by(-3 if event.delta > 0 else 3))
+        self.listbox.bind('<Button-4>', lambda event: self.scroll_by(-3))
+        self.listbox.bind('<Button-5>', lambda event: self.scroll_by(3))
+        self.listbox.bind('<Prior>', lambda event: self.scroll_by(-self.visible_rows()))
+        self.listbox.bind('<Next>', lambda event: self.scroll_by(self.visible_rows()))
+        self.listbox.bind('<Home>', lambda event: self.scroll_to(0))
+        self.listbox.bind('<End>', lambda event: self.scroll_to(self.index.size()))
+    
+    def visible_rows(self):
+        return max(self.listbox.winfo_height() // self.line_height, 1)
+    
+    def sync(self, generator):
+        """Track new input in `generator` and repaint, keeping the scroll position."""
+        self.index.sync(generator)
+        self.refresh()
+    
+    def clear(self):
+        self.index.reset()
+        self.top = 0
+        self.refresh()
+    
+    def on_scroll(self, action, amount, unit=None):
+        """Handle scrollbar drags ("moveto") and clicks ("scroll")."""
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.index.size()))
+        else:
+            step = self.visible_rows() if unit == 'pages' else 1
+            self.scroll_by(int(amount) * step)
+    
+    def scroll_by(self, rows):
+        self.scroll_to(self.top + rows)
+        return 'break'
+    
+    def scroll_to(self, position):
+        """Show the rows starting at `position` (0-based)."""
+        self.top = max(min(position, self.index.size() - self.visible_rows()), 0)
+        self.refresh()
+    
+    def refresh(self):
+        """Repaint only the rows that fit in the widget."""
+        rows = self.visible_rows()
+        total = self.index.size()
+        self.top = max(min(self.top, total - rows), 0)
+        
+        width = len(f"{total:,}")
+        lines = [
+            f"{self.top + i + 1:>{width},}  {ip}"
+            for i, ip in enumerate(self.index.rows(self.top, rows))
+        ]
+        self.listbox.delete(0, tk.END)
+        if lines:
+            self.listbox.insert(tk.END, *lines)
+        
+        if total:
+            self.scrollbar.set(self.top / total, min((self.top + rows) / total, 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
 
 class IPGenGUI:
     def __init__(self, root):
@@ -29,8 +519,10 @@ class IPGenGUI:
         self.root.minsize(600, 400)
         
         self.generator = IPGenerator()
+        self.summary = GeneratorSummary()
         self.file_path = tk.StringVar()
         self.ip_count = 0
+        self.task = None
         self.setup_gui()
         self.show_single_ip_fields()  # Show default fields
     
@@ -39,11 +531,23 @@ class IPGenGUI:
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Status bar
+        # Status bar with progress of background tasks
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        
         self.status_var = tk.StringVar()
         self.status_var.set("Ready - 0 IPs loaded")
-        status_bar = ttk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        self.cancel_button = ttk.Button(status_frame, text="Cancel", command=self.cancel_task, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        
+        self.eta_var = tk.StringVar()
+        ttk.Label(status_frame, textvariable=self.eta_var, width=14).pack(side=tk.RIGHT, padx=5)
+        
+        self.progress_bar = ttk.Progressbar(status_frame, length=150, maximum=100)
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
         
         # Input section
         input_frame = ttk.LabelFrame(main_frame, text="Input", padding="5")
@@ -87,8 +591,10 @@ class IPGenGUI:
         add_button_frame = ttk.Frame(input_frame)
         add_button_frame.pack(fill=tk.X, pady=5)
         
-        ttk.Button(add_button_frame, text="Add to Generator", command=self.add_to_generator).pack(side=tk.LEFT, padx=5)
-        ttk.Button(add_button_frame, text="Clear Generator", command=self.clear_generator).pack(side=tk.LEFT, padx=5)
+        self.add_button = ttk.Button(add_button_frame, text="Add to Generator", command=self.add_to_generator)
+        self.add_button.pack(side=tk.LEFT, padx=5)
+        self.clear_button = ttk.Button(add_button_frame, text="Clear Generator", command=self.clear_generator)
+        self.clear_button.pack(side=tk.LEFT, padx=5)
         
         # Output section
         output_frame = ttk.LabelFrame(main_frame, text="Output", padding="5")
@@ -109,14 +615,19 @@ class IPGenGUI:
         self.output_type.pack(side=tk.LEFT, padx=5)
         self.output_type.set("Preview")
         
-        ttk.Button(output_controls_frame, text="Generate Output", command=self.generate_output).pack(side=tk.LEFT, padx=5)
+        self.output_button = ttk.Button(output_controls_frame, text="Generate Output", command=self.generate_output)
+        self.output_button.pack(side=tk.LEFT, padx=5)
         
-        # Preview text with scrollbar
-        preview_frame = ttk.Frame(output_frame)
-        preview_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        # Jump to a row of the preview
+        ttk.Button(output_controls_frame, text="Go", width=4, command=self.goto_row).pack(side=tk.RIGHT, padx=5)
+        self.goto_entry = ttk.Entry(output_controls_frame, width=14)
+        self.goto_entry.pack(side=tk.RIGHT, padx=5)
+        self.goto_entry.bind('<Return>', lambda event: self.goto_row())
+        ttk.Label(output_controls_frame, text="Go to row:").pack(side=tk.RIGHT, padx=5)
         
-        self.preview_text = scrolledtext.ScrolledText(preview_frame, height=10)
-        self.preview_text.pack(fill=tk.BOTH, expand=True)
+        # Preview of every generated IP, rendered on demand
+        self.preview_view = VirtualListView(output_frame)
+        self.preview_view.pack(fill=tk.BOTH, expand=True, pady=5)
     
     def on_input_type_change(self, event=None):
         # Clear previous input fields
@@ -271,7 +782,7 @@ class IPGenGUI:
                 ip = self.ip_entry.get().strip()
                 if ip:
                     self.generator.add_ip(ip)
-                    messagebox.showinfo("Success", f"Added IP: {ip}")
+                    message = f"Added IP: {ip}"
                 else:
                     messagebox.showerror("Error", "Please enter an IP address")
                     return
@@ -281,7 +792,7 @@ class IPGenGUI:
                 end = self.end_ip.get().strip()
                 if start and end:
                     self.generator.add_range(start, end)
-                    messagebox.showinfo("Success", f"Added range: {start} - {end}")
+                    message = f"Added range: {start} - {end}"
                 else:
                     messagebox.showerror("Error", "Please enter both start and end IP addresses")
                     return
@@ -290,7 +801,7 @@ class IPGenGUI:
                 cidr = self.cidr_entry.get().strip()
                 if cidr:
                     self.generator.add_cidr(cidr)
-                    messagebox.showinfo("Success", f"Added CIDR: {cidr}")
+                    message = f"Added CIDR: {cidr}"
                 else:
                     messagebox.showerror("Error", "Please enter a CIDR notation")
                     return
@@ -300,7 +811,7 @@ class IPGenGUI:
                 wildcard = self.wildcard_mask.get().strip()
                 if ip and wildcard:
                     self.generator.add_wildcard(ip, wildcard)
-                    messagebox.showinfo("Success", f"Added wildcard pattern: {ip}/{wildcard}")
+                    message = f"Added wildcard pattern: {ip}/{wildcard}"
                 else:
                     messagebox.showerror("Error", "Please enter both IP address and wildcard mask")
                     return
@@ -310,65 +821,161 @@ class IPGenGUI:
                 subnet = self.subnet_entry.get().strip()
                 if gateway and subnet:
                     self.generator.add_gateway_subnet(gateway, subnet)
-                    messagebox.showinfo("Success", f"Added gateway/subnet: {gateway}/{subnet}")
+                    message = f"Added gateway/subnet: {gateway}/{subnet}"
                 else:
                     messagebox.showerror("Error", "Please enter both gateway and subnet mask")
                     return
             
             elif input_type in ["CSV File", "Excel File", "JSON File", "YAML File"]:
                 if hasattr(self, 'file_full_path') and self.file_full_path:
-                    if input_type == "CSV File":
-                        new_generator = parse_csv(self.file_full_path)
-                    elif input_type == "Excel File":
-                        new_generator = parse_excel(self.file_full_path)
-                    elif input_type == "JSON File":
-                        new_generator = parse_json(self.file_full_path)
-                    elif input_type == "YAML File":
-                        new_generator = parse_yaml(self.file_full_path)
-                    
-                    # Merge the generators
-                    self.generator = new_generator
-                    messagebox.showinfo("Success", f"Loaded file: {self.file_path.get()}")
+                    parsers = {
+                        "CSV File": parse_csv,
+                        "Excel File": parse_excel,
+                        "JSON File": parse_json,
+                        "YAML File": parse_yaml
+                    }
+                    # Parsing and merging run on a worker
+                    self.run_task(
+                        f"Loading {self.file_path.get()}",
+                        self.on_file_loaded,
+                        load_task,
+                        parsers[input_type],
+                        self.file_full_path,
+                        self.generator,
+                        self.summary
+                    )
+                    return
                 else:
                     messagebox.showerror("Error", "Please select a file first")
                     return
             
             # Update IP count and status
-            self.count_ips()
+            count = self.ip_count
+            overlap = self.update_summary()
+            if self.ip_count == count:
+                message += "\n\nThis IP was already in the generator."
+            elif overlap:
+                message += f"\n\nWarning: {overlap} of these IPs were already in the generator."
+            messagebox.showinfo("Success", message)
         
         except Exception as e:
             messagebox.showerror("Error", str(e))
     
-    def count_ips(self):
-        """Count IPs in the generator and update status."""
-        # This could be slow for large generators, consider using a background thread
-        ip_count = sum(1 for _ in self.generator.generate())
-        self.ip_count = ip_count
-        self.status_var.set(f"Ready - {ip_count} IPs loaded")
+    def on_file_loaded(self, overlap):
+        """Report a file that has been merged into the generator."""
+        self.update_summary()
+        message = f"Loaded file: {self.file_path.get()}"
+        if overlap:
+            message += f"\n\nWarning: {overlap} of these IPs were already in the generator."
+        messagebox.showinfo("Success", message)
+    
+    def update_summary(self):
+        """Bring the summary, status and preview up to date with the generator.
         
-        # Show preview
+        Returns how many newly added addresses were already present.
+        """
+        overlap = self.summary.sync(self.generator)
+        self.ip_count = self.summary.count
+        self.status_var.set(self.ready_status())
         self.preview_ips()
+        return overlap
+    
+    def ready_status(self, prefix="Ready"):
+        """Status bar text describing the loaded IPs."""
+        summary = self.summary
+        return (f"{prefix} - {summary.count} IPs loaded "
+                f"({summary.unique_count} unique in {summary.range_count} ranges)")
+    
+    def run_task(self, description, on_done, func, *args, cancellable=True):
+        """Start `func` on a background worker and poll it from the Tk loop.
+        
+        The Cancel button stays disabled unless `cancellable` is set.
+        """
+        if self.task is not None:
+            messagebox.showerror("Error", f"Please wait: {self.task.description.lower()} is still running")
+            return
+        
+        self.task = BackgroundTask(description, func, *args)
+        self.task.on_done = on_done
+        self.status_var.set(f"{description}...")
+        self.eta_var.set("")
+        self.progress_bar.configure(mode='indeterminate', value=0)
+        self.progress_bar.start()
+        self.set_busy(True, cancellable)
+        self.task.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_task)
+    
+    def poll_task(self):
+        """Update progress of the running task, or finish it."""
+        task = self.task
+        if task is None:
+            return
+        
+        outcome = task.outcome()
+        if outcome is None:
+            fraction, eta = task.progress_state()
+            if fraction is not None:
+                if str(self.progress_bar.cget('mode')) != 'determinate':
+                    self.progress_bar.stop()
+                    self.progress_bar.configure(mode='determinate')
+                self.progress_bar.configure(value=fraction * 100)
+            self.eta_var.set(f"ETA {format_eta(eta)}" if eta is not None else "")
+            self.root.after(POLL_INTERVAL_MS, self.poll_task)
+            return
+        
+        self.finish_task()
+        status, value = outcome
+        if status == 'done':
+            task.on_done(value)
+        elif status == 'error':
+            self.status_var.set(self.ready_status())
+            messagebox.showerror("Error", str(value))
+        else:
+            self.status_var.set(self.ready_status("Cancelled"))
+    
+    def cancel_task(self):
+        """Ask the running task to stop at its next progress report."""
+        if self.task is not None:
+            self.task.cancel()
+            self.status_var.set(f"Cancelling {self.task.description.lower()}...")
+    
+    def finish_task(self):
+        """Reset the progress widgets after a task has ended."""
+        self.task = None
+        self.progress_bar.stop()
+        self.progress_bar.configure(mode='determinate', value=0)
+        self.eta_var.set("")
+        self.set_busy(False)
+    
+    def set_busy(self, busy, cancellable=True):
+        """Disable inputs that would change the generator while a task runs."""
+        state = tk.DISABLED if busy else tk.NORMAL
+        for button in (self.add_button, self.clear_button, self.output_button):
+            button.configure(state=state)
+        self.cancel_button.configure(state=tk.NORMAL if busy and cancellable else tk.DISABLED)
     
     def clear_generator(self):
         """Clear all IP addresses from the generator."""
         self.generator = IPGenerator()
+        self.summary.reset()
         self.ip_count = 0
         self.status_var.set("Ready - 0 IPs loaded")
-        self.preview_text.delete(1.0, tk.END)
+        self.preview_view.clear()
         messagebox.showinfo("Success", "Generator cleared")
     
     def preview_ips(self):
         """Show preview of generated IPs."""
-        self.preview_text.delete(1.0, tk.END)
-        count = 0
-        
-        for ip in self.generator.generate():
-            if count >= 100:
-                self.preview_text.insert(tk.END, "...\n")
-                self.preview_text.insert(tk.END, f"(Showing 100 of {self.ip_count} IPs)")
-                break
-            self.preview_text.insert(tk.END, f"{ip}\n")
-            count += 1
+        self.preview_view.sync(self.generator)
+    
+    def goto_row(self):
+        """Scroll the preview to the row number typed by the user."""
+        text = self.goto_entry.get().strip().replace(',', '')
+        try:
+            row = int(text)
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a row number")
+            return
+        self.preview_view.scroll_to(row - 1)
     
     def generate_output(self):
         """Generate output based on selected output type."""
@@ -392,18 +999,24 @@ class IPGenGUI:
             )
             
             if filename:
-                if output_type == "CSV File":
-                    self.generator.to_csv(filename)
-                elif output_type == "Excel File":
-                    self.generator.to_excel(filename)
-                elif output_type == "JSON File":
-                    self.generator.to_json(filename)
-                elif output_type == "YAML File":
-                    self.generator.to_yaml(filename)
-                messagebox.showinfo("Success", f"Saved output to: {os.path.basename(filename)}")
+                self.run_task(
+                    f"Saving {os.path.basename(filename)}",
+                    self.on_saved,
+                    export_task,
+                    self.generator,
+                    output_type,
+                    filename,
+                    self.ip_count,
+                    cancellable=output_type in EXPORT_CANCELLABLE
+                )
         
         except Exception as e:
             messagebox.showerror("Error", str(e))
+    
+    def on_saved(self, filename):
+        """Report a finished export."""
+        self.status_var.set(self.ready_status())
+        messagebox.showinfo("Success", f"Saved output to: {os.path.basename(filename)}")
 
 def main():
     """Start the GUI application."""
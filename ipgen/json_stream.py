@@ -0,0 +1,177 @@
+"""
+Incremental JSON reader for streaming large arrays out of input files.
+"""
+import json
+import re
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO, Tuple
+
+# Characters read from the file at a time
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# An array element that is a string without escapes, plus the delimiter after it
+_SIMPLE_STRING_ITEM = re.compile(r'[ \t\n\r]*"([^"\\\x00-\x1f]*)"[ \t\n\r]*([,\]])')
+# Text that may still continue a number, e.g. "1." before "25" arrives
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+_decoder = json.JSONDecoder()
+
+class JSONStreamReader:
+    """Tokenize a JSON document from a file in fixed-size chunks.
+
+    Only the structure around the arrays of interest is walked by hand;
+    each array element is decoded on its own with ``raw_decode``. Consumed
+    text is dropped on every refill, so memory stays a small multiple of
+    the chunk size as long as individual elements are small.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        # Largest single value we will buffer before giving up on it
+        self._max_value = max(16 * chunk_size, 1 << 16)
+        self._buffer = ''
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read another chunk, dropping consumed text. Returns False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        if not chunk:
+            self._eof = True
+        return bool(chunk)
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid JSON: {message} at char {self._offset + self._pos}")
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at the end)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        """Consume `char` or raise ValueError."""
+        if self.peek() != char:
+            raise self._error(f"expecting {char!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if len(self._buffer) - self._pos < self._max_value and self._fill():
+                    continue
+                raise self._error(e.msg) from None
+            # A number cut off by the chunk boundary decodes short: "12" of
+            # "123", or "1" of "1.5e10" when the buffer ends at "1.5e"
+            if _NUMBER_TAIL.match(self._buffer, end) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self, read: Optional[Callable[[], Any]] = None) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position.
+
+        Elements are read with `read`, which defaults to ``value``. Plain
+        strings, the common case for address lists, are matched directly.
+        """
+        simple = read is None
+        read = read or self.value
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            match = simple and _SIMPLE_STRING_ITEM.match(self._buffer, self._pos)
+            if match:
+                self._pos = match.end()
+                yield match.group(1)
+                char = match.group(2)
+            else:
+                yield read()
+                char = self.peek()
+                self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                self._pos -= 1
+                raise self._error("expecting ',' or ']'")
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield the keys of the object at the current position.
+
+        The caller must consume each member's value (with ``value``,
+        ``iter_array`` or ``skip``) before asking for the next key.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self._error("expecting property name")
+            key = self.value()
+            self.expect(':')
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                self._pos -= 1
+                raise self._error("expecting ',' or '}'")
+
+    def skip(self) -> None:
+        """Consume the next value without keeping nested containers in memory."""
+        char = self.peek()
+        if char == '[':
+            for _ in self.iter_array(self.skip):
+                pass
+        elif char == '{':
+            for _ in self.iter_object():
+                self.skip()
+        else:
+            self.value()
+
+    def end(self) -> None:
+        """Check that nothing but whitespace is left."""
+        if self.peek():
+            raise self._error("extra data")
+
+def iter_json_arrays(f: TextIO, keys: Iterable[str],
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[Optional[str], Any]]:
+    """Yield (key, element) for each element of the top-level arrays under `keys`.
+
+    A document that is itself an array yields (None, element) pairs.
+    Everything else in the document is skipped without being built.
+    """
+    keys = set(keys)
+    reader = JSONStreamReader(f, chunk_size)
+    char = reader.peek()
+
+    if char == '[':
+        for item in reader.iter_array():
+            yield None, item
+    elif char == '{':
+        for key in reader.iter_object():
+            if key in keys and reader.peek() == '[':
+                for item in reader.iter_array():
+                    yield key, item
+            else:
+                reader.skip()
+    else:
+        reader.skip()
+
+    reader.end()
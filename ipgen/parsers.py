@@ -1,69 +1,318 @@
 """
 Input parsers for various IP address formats and file types.
 """
-import pandas as pd
-import json
-import yaml
-from typing import List, Union, Dict, Any
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union, Dict, Any
 from pathlib import Path
+from .compression import open_input, pandas_compression, strip_compression_suffix
 from .core import IPGenerator
+from .json_stream import CHUNK_SIZE, iter_json_arrays
 
-def parse_csv(filepath: Union[str, Path], ip_column: str = 'ip_address') -> IPGenerator:
-    """Parse IP addresses from a CSV file."""
-    df = pd.read_csv(filepath)
-    generator = IPGenerator()
-    
-    for ip in df[ip_column]:
-        generator.add_ip(ip)
+# Number of addresses or ranges collected before they are added to a generator
+BATCH_SIZE = 10000
+
+# Callback taking (bytes_read, file_size), see open_input
+Progress = Callable[[int, int], None]
+
+# Input formats by file suffix; other files are sniffed (see detect_format)
+FILE_FORMATS = {
+    '.csv': 'csv',
+    '.xlsx': 'excel',
+    '.xls': 'excel',
+    '.json': 'json',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+}
+
+# Formats parse_many hands to worker processes, as parsing them holds the GIL
+PROCESS_FORMATS = frozenset({'excel', 'yaml'})
+
+class FileResult(NamedTuple):
+    """Outcome of parsing one file in parse_many."""
+    path: str
+    format: str
+    seconds: float
+    count: int
+    error: Optional[Exception]
+
+def parse_csv(filepath: Union[str, Path], ip_column: str = 'ip_address',
+              progress: Optional[Progress] = None) -> IPGenerator:
+    """Parse IP addresses from a CSV file, which may be compressed.
     
+    `progress` is called with (bytes_read, file_size) as the file is read;
+    see open_input. Zip, zstd and tar files (PANDAS_SUFFIXES) are read by
+    pandas itself and report no progress.
+    """
+    import pandas as pd
+    if pandas_compression(filepath):
+        df = pd.read_csv(filepath)
+    else:
+        with open_input(filepath, progress=progress) as f:
+            df = pd.read_csv(f)
+    generator = IPGenerator()
+    generator.add_ips(df[ip_column])
     return generator
 
-def parse_excel(filepath: Union[str, Path], ip_column: str = 'ip_address') -> IPGenerator:
-    """Parse IP addresses from an Excel file."""
-    df = pd.read_excel(filepath)
+def parse_excel(filepath: Union[str, Path], ip_column: str = 'ip_address',
+                progress: Optional[Progress] = None) -> IPGenerator:
+    """Parse IP addresses from an Excel file, reporting `progress` as for parse_csv."""
+    import pandas as pd
+    with open_input(filepath, progress=progress) as f:
+        df = pd.read_excel(f)
     generator = IPGenerator()
+    generator.add_ips(df[ip_column])
+    return generator
+
+def parse_json(filepath: Union[str, Path], chunk_size: int = CHUNK_SIZE,
+               batch_size: int = BATCH_SIZE, progress: Optional[Progress] = None) -> IPGenerator:
+    """Parse IP addresses from a JSON file.
     
-    for ip in df[ip_column]:
-        generator.add_ip(ip)
+    The file is read incrementally, so arbitrarily large `ip_addresses`
+    and `ranges` arrays are added in batches as they are found. Wildcard
+    patterns and subnet sweeps saved by IPGenerator.to_json are read
+    from `wildcards` and `sweeps`. Compressed files are decompressed as
+    they are read, and `progress` is called with (bytes_read, file_size)
+    every chunk (see open_input).
+    """
+    generator = IPGenerator()
+    ips = []
+    ranges = []
+    
+    with open_input(filepath, 'r', progress) as f:
+        for key, item in iter_json_arrays(f, ('ip_addresses', 'ranges', 'wildcards', 'sweeps'),
+                                          chunk_size):
+            if key == 'ranges':
+                ranges.append(item)
+            elif key == 'wildcards':
+                _add_wildcard(generator, item)
+            elif key == 'sweeps':
+                _add_sweep(generator, item)
+            else:
+                ips.append(item)
+            
+            if len(ips) + len(ranges) >= batch_size:
+                _add_batch(generator, ips, ranges)
     
+    _add_batch(generator, ips, ranges)
     return generator
 
-def parse_json(filepath: Union[str, Path]) -> IPGenerator:
-    """Parse IP addresses from a JSON file."""
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+def _add_batch(generator: IPGenerator, ips: List[str], ranges: List[List[str]]) -> None:
+    """Add a batch of parsed addresses and ranges to the generator and empty it."""
+    generator.add_ips(ips)
+    for start, end in ranges:
+        generator.add_range(start, end)
+    ips.clear()
+    ranges.clear()
+
+def _add_wildcard(generator: IPGenerator, wildcard: List[str]) -> None:
+    """Add an (ip, wildcard) pattern saved by to_json/to_yaml; it was size-checked when created."""
+    ip, mask = wildcard
+    generator.add_wildcard(ip, mask, max_ranges=None)
+
+def _add_sweep(generator: IPGenerator, sweep: Dict[str, Any]) -> None:
+    """Add a subnet sweep saved by to_json/to_yaml; it was size-checked when created."""
+    generator.add_subnet_sweep(sweep['network'], sweep['hosts'], sweep['subnet_prefix'],
+                               max_addresses=None, max_ranges=None)
+
+def parse_yaml(filepath: Union[str, Path], progress: Optional[Progress] = None) -> IPGenerator:
+    """Parse IP addresses from a YAML file, which may be compressed.
+    
+    `progress` is reported as for parse_csv.
+    """
+    import yaml
+    # libyaml's CSafeLoader is many times faster when PyYAML was built with it
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open_input(filepath, 'r', progress) as f:
+        data = yaml.load(f, Loader=loader)
     
     generator = IPGenerator()
     
     if isinstance(data, dict):
-        for ip in data.get('ip_addresses', []):
-            generator.add_ip(ip)
-        for start, end in data.get('ranges', []):
+        generator.add_ips(data.get('ip_addresses') or [])
+        for start, end in data.get('ranges') or []:
             generator.add_range(start, end)
+        for wildcard in data.get('wildcards') or []:
+            _add_wildcard(generator, wildcard)
+        for sweep in data.get('sweeps') or []:
+            _add_sweep(generator, sweep)
     elif isinstance(data, list):
-        for ip in data:
-            generator.add_ip(ip)
+        generator.add_ips(data)
     
     return generator
 
-def parse_yaml(filepath: Union[str, Path]) -> IPGenerator:
-    """Parse IP addresses from a YAML file."""
-    with open(filepath, 'r') as f:
-        data = yaml.safe_load(f)
+def parse_sql(engine_or_url, table: str, ip_column: str = 'ip_address',
+              batch_size: int = BATCH_SIZE) -> IPGenerator:
+    """Parse IP addresses from a database table through SQLAlchemy.
+    
+    Tables written by to_sql with ranges (`start_ip`/`end_ip` columns) are
+    read as ranges; anything else is read from `ip_column`. Rows are fetched
+    in batches with a server-side cursor where the driver supports one.
+    """
+    from sqlalchemy import MetaData, Table, create_engine, select
     
+    engine = create_engine(engine_or_url) if isinstance(engine_or_url, str) else engine_or_url
     generator = IPGenerator()
     
-    if isinstance(data, dict):
-        for ip in data.get('ip_addresses', []):
-            generator.add_ip(ip)
-        for start, end in data.get('ranges', []):
-            generator.add_range(start, end)
-    elif isinstance(data, list):
-        for ip in data:
-            generator.add_ip(ip)
+    try:
+        with engine.connect() as conn:
+            sql = Table(table, MetaData(), autoload_with=conn)
+            ranges = 'start_ip' in sql.c and 'end_ip' in sql.c
+            if ranges:
+                query = select(sql.c.start_ip, sql.c.end_ip)
+            else:
+                query = select(sql.c[ip_column])
+            if 'id' in sql.c:
+                query = query.order_by(sql.c.id)
+            
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+            for rows in result.partitions():
+                if ranges:
+                    _add_batch(generator, [], [tuple(row) for row in rows])
+                else:
+                    _add_batch(generator, [row[0] for row in rows], [])
+    finally:
+        if engine is not engine_or_url:
+            engine.dispose()
     
     return generator
 
+def add_target(generator: IPGenerator, target: str) -> None:
+    """Add a CIDR ("10.0.0.0/8"), range ("10.0.0.1-10.0.0.9") or single IP."""
+    if '/' in target:
+        generator.add_cidr(target)
+    elif '-' in target:
+        start, end = target.split('-', 1)
+        generator.add_range(start.strip(), end.strip())
+    else:
+        generator.add_ip(target)
+
+def add_lines(generator: IPGenerator, lines) -> None:
+    """Add one target per line, skipping blank lines and # comments."""
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if line:
+            add_target(generator, line)
+
+def parse_text(filepath: Union[str, Path], progress: Optional[Progress] = None) -> IPGenerator:
+    """Parse a plain text file with one CIDR, range or IP per line, which may be compressed.
+    
+    `progress` is reported as for parse_csv.
+    """
+    generator = IPGenerator()
+    with open_input(filepath, 'r', progress) as f:
+        add_lines(generator, f)
+    return generator
+
+def detect_format(filepath: Union[str, Path]) -> str:
+    """Return 'csv', 'excel', 'json', 'yaml' or 'text' for an input file.
+    
+    The suffix decides when it is known, ignoring a compression suffix
+    such as ".gz". Otherwise the first decompressed bytes are checked for
+    an Excel workbook or a JSON document, and anything else is treated as
+    one target per line.
+    """
+    kind = FILE_FORMATS.get(strip_compression_suffix(filepath).suffix.lower())
+    if kind:
+        return kind
+    
+    with open_input(filepath) as f:
+        head = f.read(512)
+    # .xlsx is a zip archive, .xls an OLE2 compound file
+    if head.startswith((b'PK\x03\x04', b'\xd0\xcf\x11\xe0')):
+        return 'excel'
+    if head.lstrip()[:1] in (b'{', b'['):
+        return 'json'
+    return 'text'
+
+def parse_file(filepath: Union[str, Path], ip_column: str = 'ip_address',
+               file_format: Optional[str] = None) -> IPGenerator:
+    """Parse an input file in any supported format, detecting it if not given."""
+    kind = file_format or detect_format(filepath)
+    if kind == 'csv':
+        return parse_csv(filepath, ip_column)
+    if kind == 'excel':
+        return parse_excel(filepath, ip_column)
+    if kind == 'json':
+        return parse_json(filepath)
+    if kind == 'yaml':
+        return parse_yaml(filepath)
+    if kind == 'text':
+        return parse_text(filepath)
+    raise ValueError(f"Unsupported input format: {kind}")
+
+def _parse_timed(filepath: str, file_format: str, ip_column: str):
+    """Parse one file for parse_many, returning (generator or None, seconds, error)."""
+    started = time.perf_counter()
+    try:
+        generator = parse_file(filepath, ip_column, file_format)
+    except Exception as e:
+        return None, time.perf_counter() - started, e
+    return generator, time.perf_counter() - started, None
+
+def iter_parse_many(paths: Iterable[Union[str, Path]], workers: Optional[int] = None,
+                    ip_column: str = 'ip_address', processes: Optional[bool] = None
+                    ) -> Iterator[Tuple[FileResult, Optional[IPGenerator]]]:
+    """Parse files concurrently, yielding (FileResult, generator) in the order of `paths`.
+    
+    Formats are detected per file as in parse_file. Excel and YAML files
+    (PROCESS_FORMATS) go to a process pool and the rest to a thread pool;
+    `processes` sends everything to one or the other instead. At most
+    `workers` files (default: one per CPU) are parsed at once per pool.
+    The generator is None for files that failed.
+    """
+    paths = [str(path) for path in paths]
+    workers = workers or min(len(paths), os.cpu_count() or 1) or 1
+    
+    with ExitStack() as stack:
+        pools = {}
+        jobs = []
+        for path in paths:
+            try:
+                kind = detect_format(path)
+            except OSError as e:
+                jobs.append((path, '', None, e))
+                continue
+            use_processes = kind in PROCESS_FORMATS if processes is None else processes
+            if use_processes not in pools:
+                executor = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+                pools[use_processes] = stack.enter_context(executor(workers))
+            future = pools[use_processes].submit(_parse_timed, path, kind, ip_column)
+            jobs.append((path, kind, future, None))
+        
+        for path, kind, future, error in jobs:
+            parsed = None
+            seconds = 0.0
+            if future is not None:
+                try:
+                    parsed, seconds, error = future.result()
+                except Exception as e:
+                    # The pool itself failed, e.g. a worker process was killed
+                    error = e
+            count = parsed.count() if parsed is not None else 0
+            yield FileResult(path, kind, seconds, count, error), parsed
+
+def parse_many(paths: Iterable[Union[str, Path]], workers: Optional[int] = None,
+               ip_column: str = 'ip_address',
+               processes: Optional[bool] = None) -> Tuple[IPGenerator, List[FileResult]]:
+    """Parse many input files concurrently and merge them into one generator.
+    
+    See iter_parse_many for how files are dispatched. Results are merged in
+    the order of `paths`, so the generator is the same as parsing the files
+    one after another. Returns it together with a FileResult per path
+    giving the parse time and address count; files that fail are skipped
+    and carry their exception.
+    """
+    generator = IPGenerator()
+    results = []
+    for result, parsed in iter_parse_many(paths, workers, ip_column, processes):
+        if parsed is not None:
+            generator.merge(parsed)
+        results.append(result)
+    return generator, results
+
 def parse_cidr(cidr: str) -> IPGenerator:
     """Parse IP addresses from CIDR notation."""
     generator = IPGenerator()
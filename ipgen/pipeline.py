@@ -0,0 +1,319 @@
+"""
+Batch pipelines between address generation and output.
+"""
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .formatters import ADDRESS_CLASSES, ARRAY_CHUNK_SIZE, iter_array_chunks, to_stream
+
+# A batch maps column names to equal-length NumPy arrays; 'ip' holds the addresses
+Batch = Dict[str, Any]
+Stage = Callable[[Iterator[Batch]], Iterator[Batch]]
+
+# Slices per second a rate-limited stage emits, so output is smooth rather than bursty
+RATE_SLICES_PER_SECOND = 10
+
+def _take(batch: Batch, index) -> Batch:
+    """Select the same rows (by mask, index array or slice) from every column."""
+    return {name: column[index] for name, column in batch.items()}
+
+def _filter_batch(predicate: Callable, column: str, exclude: bool, batch: Batch) -> Batch:
+    mask = predicate(batch[column])
+    return _take(batch, ~mask if exclude else mask)
+
+def _map_batch(func: Callable, batch: Batch) -> Batch:
+    """Apply `func` to the addresses, keeping their dtype and shape."""
+    import numpy as np
+
+    ips = batch['ip']
+    result = np.asarray(func(ips))
+    if result.shape != ips.shape:
+        raise ValueError(f"map function changed the address array shape from {ips.shape} "
+                         f"to {result.shape}")
+    if not np.can_cast(result.dtype, ips.dtype):
+        limits = np.iinfo(ips.dtype)
+        if result.dtype.kind not in 'iu' or (len(result) and (
+                result.min() < limits.min or result.max() > limits.max)):
+            raise ValueError(f"map function returned {result.dtype} values that do not fit "
+                             f"{ips.dtype} addresses")
+    batch = dict(batch)
+    batch['ip'] = result.astype(ips.dtype, copy=False)
+    return batch
+
+def _annotate_batch(name: str, func: Callable, batch: Batch) -> Batch:
+    batch = dict(batch)
+    batch[name] = func(batch['ip'])
+    return batch
+
+def _batchwise(func: Callable[[Batch], Batch], workers: Optional[int],
+               processes: bool) -> Stage:
+    """Make a stage that applies `func` to every batch, optionally in a pool.
+
+    With `workers`, up to twice that many batches are in flight at once
+    and results are yielded in input order. Process pools need `func` and
+    its arguments to be picklable (module-level functions, not lambdas).
+    """
+    def stage(batches: Iterator[Batch]) -> Iterator[Batch]:
+        if not workers:
+            yield from map(func, batches)
+            return
+        executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with executor(workers) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.submit(func, batch))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    return stage
+
+class RangeFilter:
+    """Vectorized membership of address arrays in a fixed set of ranges.
+
+    `ranges` is an IPGenerator or an iterable of CIDRs, "start-end" ranges
+    and single addresses. The merged intervals are computed once, so each
+    batch costs one searchsorted.
+    """
+
+    def __init__(self, ranges, version: int = 4):
+        import numpy as np
+        from .core import IPGenerator
+        from .parsers import add_target
+
+        if not isinstance(ranges, IPGenerator):
+            generator = IPGenerator()
+            for target in ranges:
+                add_target(generator, target)
+            ranges = generator
+        self._generator = ranges
+        self._version = version
+        starts, ends = ranges.intervals(version)
+        if version == 4:
+            self._starts = np.array(starts, dtype=np.int64)
+            self._ends = np.array(ends, dtype=np.int64)
+
+    def __call__(self, ips):
+        import numpy as np
+
+        if self._version != 4:
+            return self._generator.contains_many(ips)
+        values = ips.astype(np.int64)
+        index = np.searchsorted(self._starts, values, side='right') - 1
+        return (index >= 0) & (values <= self._ends[np.maximum(index, 0)])
+
+class Dedupe:
+    """Drop addresses seen earlier in the stream, keeping first occurrences.
+
+    IPv4 addresses are marked in a bitmap with one 64 KiB page per /16
+    that appears, so the check is vectorized and memory follows the
+    spread of the input rather than its length. IPv6 rows use a set.
+    """
+
+    def __init__(self):
+        import numpy as np
+
+        self._page_of = np.full(1 << 16, -1, dtype=np.int64)
+        self._pages = np.zeros((0, 1 << 16), dtype=bool)
+        self._page_count = 0
+        self._seen6 = set()
+
+    def _ipv4_pages(self, high):
+        """Return the bitmap page of every /16 in `high`, allocating new ones."""
+        import numpy as np
+
+        new = np.unique(high[self._page_of[high] < 0])
+        if len(new):
+            needed = self._page_count + len(new)
+            if needed > len(self._pages):
+                grown = np.zeros((max(needed, 2 * len(self._pages)), 1 << 16), dtype=bool)
+                grown[:self._page_count] = self._pages[:self._page_count]
+                self._pages = grown
+            self._page_of[new] = np.arange(self._page_count, needed)
+            self._page_count = needed
+        return self._page_of[high]
+
+    def __call__(self, batches: Iterator[Batch]) -> Iterator[Batch]:
+        import numpy as np
+
+        for batch in batches:
+            ips = batch['ip']
+            if ips.ndim == 2:
+                keep = [i for i, row in enumerate(map(tuple, ips.tolist()))
+                        if not (row in self._seen6 or self._seen6.add(row))]
+                yield _take(batch, np.array(keep, dtype=np.int64))
+                continue
+
+            # First occurrence of each address within the batch, in input order
+            _, first = np.unique(ips, return_index=True)
+            first.sort()
+            values = ips[first].astype(np.int64)
+            pages = self._ipv4_pages(values >> 16)
+            low = values & 0xFFFF
+            fresh = ~self._pages[pages, low]
+            self._pages[pages[fresh], low[fresh]] = True
+            yield _take(batch, first[fresh])
+
+def _limit(count: int, batches: Iterator[Batch]) -> Iterator[Batch]:
+    """Stop after `count` addresses without pulling further batches."""
+    remaining = count
+    if remaining <= 0:
+        return
+    for batch in batches:
+        size = len(batch['ip'])
+        if size >= remaining:
+            yield _take(batch, slice(0, remaining))
+            return
+        yield batch
+        remaining -= size
+
+def _rate(per_second: float, batches: Iterator[Batch]) -> Iterator[Batch]:
+    """Pace batches to at most `per_second` addresses, split into small slices."""
+    step = max(int(per_second / RATE_SLICES_PER_SECOND), 1)
+    started = time.monotonic()
+    sent = 0
+    for batch in batches:
+        size = len(batch['ip'])
+        for first in range(0, size, step):
+            wait = started + sent / per_second - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            piece = batch if step >= size else _take(batch, slice(first, first + step))
+            yield piece
+            sent += len(piece['ip'])
+
+class Pipeline:
+    """A chain of batch stages over a generator's addresses.
+
+    Addresses flow as NumPy arrays: uint32 for IPv4, (n, 2) uint64
+    (high, low) for IPv6, as written by to_npy. Only the source's
+    addresses of `version` enter the pipeline. Each batch is a dict with
+    the addresses under 'ip' plus any columns added by ``annotate``. Stage
+    methods return the pipeline so they can be chained::
+
+        generator.pipeline().filter_ranges(["10.0.0.0/8"], exclude=True) \\
+            .dedupe().limit(1000000).to_stream(sys.stdout.buffer)
+
+    ``filter``, ``map`` and ``annotate`` accept `workers` to run that stage
+    in a thread pool, or a process pool with `processes=True`. NumPy
+    releases the GIL for most array work, so threads usually suffice.
+
+    Nothing runs until the pipeline is iterated (``batches``, ``run`` or
+    an exporter); every run starts over from the source.
+    """
+
+    def __init__(self, source, version: int = 4, chunk_size: int = ARRAY_CHUNK_SIZE):
+        self._source = source
+        self.version = version
+        self._chunk_size = chunk_size
+        self._stages = []
+
+    def add_stage(self, stage: Stage) -> 'Pipeline':
+        """Append a stage: a callable taking and returning an iterator of batches."""
+        self._stages.append(stage)
+        return self
+
+    def filter(self, predicate: Callable, column: str = 'ip', exclude: bool = False,
+               workers: Optional[int] = None, processes: bool = False) -> 'Pipeline':
+        """Keep rows where `predicate(batch[column])` returns True (or False with `exclude`)."""
+        func = partial(_filter_batch, predicate, column, exclude)
+        return self.add_stage(_batchwise(func, workers, processes))
+
+    def filter_ranges(self, ranges, exclude: bool = False,
+                      workers: Optional[int] = None, processes: bool = False) -> 'Pipeline':
+        """Keep addresses inside `ranges` (or outside with `exclude`); see RangeFilter."""
+        return self.filter(RangeFilter(ranges, self.version), exclude=exclude,
+                           workers=workers, processes=processes)
+
+    def map(self, func: Callable, workers: Optional[int] = None,
+            processes: bool = False) -> 'Pipeline':
+        """Replace the addresses with `func(addresses)`.
+
+        The result must keep the length and is cast back to the address
+        dtype; other lengths, or values that do not fit, raise ValueError.
+        """
+        return self.add_stage(_batchwise(partial(_map_batch, func), workers, processes))
+
+    def annotate(self, name: str, func: Callable, workers: Optional[int] = None,
+                 processes: bool = False) -> 'Pipeline':
+        """Add column `name` computed as `func(addresses)`."""
+        return self.add_stage(_batchwise(partial(_annotate_batch, name, func), workers, processes))
+
+    def dedupe(self) -> 'Pipeline':
+        """Drop repeated addresses across the whole stream; see Dedupe."""
+        return self.add_stage(lambda batches: Dedupe()(batches))
+
+    def limit(self, count: int) -> 'Pipeline':
+        """Stop after `count` addresses."""
+        return self.add_stage(partial(_limit, count))
+
+    def rate(self, per_second: float) -> 'Pipeline':
+        """Emit at most `per_second` addresses per second."""
+        if per_second <= 0:
+            raise ValueError("Rate must be positive")
+        return self.add_stage(partial(_rate, per_second))
+
+    def batches(self) -> Iterator[Batch]:
+        """Run the pipeline, yielding non-empty output batches."""
+        batches = (
+            {'ip': ips}
+            for ips in iter_array_chunks(self._source, self.version, self._chunk_size,
+                                         skip_other=True)
+        )
+        for stage in self._stages:
+            batches = stage(batches)
+        return (batch for batch in batches if len(batch['ip']))
+
+    def run(self, sink: Optional[Callable[[Batch], Any]] = None) -> int:
+        """Run the pipeline into `sink(batch)`, returning the number of addresses."""
+        total = 0
+        for batch in self.batches():
+            if sink is not None:
+                sink(batch)
+            total += len(batch['ip'])
+        return total
+
+    def iter_arrays(self, chunk_size: Optional[int] = None) -> Iterator[Any]:
+        """Yield the output addresses batch by batch (IPv4 only).
+
+        Batch sizes are set by the stages; `chunk_size` is accepted so the
+        pipeline can be passed to the array exporters.
+        """
+        if self.version != 4:
+            raise ValueError("iter_arrays only supports IPv4 pipelines")
+        for batch in self.batches():
+            yield batch['ip']
+
+    def iter_int_ranges(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield output addresses as (version, start, end) runs of consecutive values."""
+        import numpy as np
+
+        for batch in self.batches():
+            ips = batch['ip']
+            if ips.ndim == 2:
+                for high, low in ips.tolist():
+                    value = high << 64 | low
+                    yield 6, value, value
+                continue
+            values = ips.astype(np.int64)
+            breaks = np.flatnonzero(np.diff(values) != 1) + 1
+            starts = np.concatenate(([0], breaks))
+            ends = np.concatenate((breaks, [len(values)])) - 1
+            for start, end in zip(values[starts].tolist(), values[ends].tolist()):
+                yield 4, start, end
+
+    def generate(self) -> Iterator[Any]:
+        """Yield output addresses as address objects."""
+        for version, start, end in self.iter_int_ranges():
+            address = ADDRESS_CLASSES[version]
+            for value in range(start, end + 1):
+                yield address(value)
+
+    __iter__ = generate
+
+    def to_stream(self, stream, output_format: str = 'plain') -> None:
+        """Write the output addresses to a binary stream; see formatters.to_stream."""
+        to_stream(self, stream, output_format)
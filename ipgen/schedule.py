@@ -0,0 +1,159 @@
+"""
+Round-robin scheduling of generated addresses across subnet buckets.
+"""
+import ipaddress
+from collections import deque
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from .formatters import ADDRESS_CLASSES, ARRAY_CHUNK_SIZE
+
+# Upper bound on buckets, since every bucket keeps a cursor in memory
+MAX_BUCKETS = 1 << 20
+
+Weight = Callable[[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]], int]
+
+class RoundRobin:
+    """Emit a generator's addresses round-robin across buckets.
+
+    Buckets are the /`prefix` subnets (/`prefix6` for IPv6) covered by
+    the generator's merged intervals, or each input range when `prefix` is
+    None. Every round takes `weights(first address of bucket)` addresses
+    (default 1) from each bucket in turn, so consecutive probes land on
+    different subnets. Only a cursor per bucket is kept. A `prefix`
+    outside 0-32 or `prefix6` outside 0-128 raises ValueError.
+
+    The object exposes ``iter_int_ranges`` and iterates like ``generate()``,
+    so it can be passed to any of the formatters.
+    """
+
+    def __init__(self, generator, prefix: Optional[int] = 24, prefix6: int = 64,
+                 weights: Optional[Weight] = None):
+        if prefix is not None and not 0 <= prefix <= 32:
+            raise ValueError(f"prefix must be between 0 and 32, got {prefix}")
+        if not 0 <= prefix6 <= 128:
+            raise ValueError(f"prefix6 must be between 0 and 128, got {prefix6}")
+        self._generator = generator
+        self._prefixes = {4: prefix, 6: prefix6}
+        self._by_range = prefix is None
+        self._weights = weights
+
+    def _spans(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield the (version, start, end) spans that are split into buckets."""
+        if self._by_range:
+            yield from self._generator.iter_int_ranges()
+            return
+        for version in (4, 6):
+            starts, ends = self._generator.intervals(version)
+            yield from ((version, start, end) for start, end in zip(starts, ends))
+
+    def bucket_count(self) -> int:
+        """Number of buckets, computed without building them."""
+        if self._by_range:
+            return sum(1 for _ in self._spans())
+        total = 0
+        for version, start, end in self._spans():
+            host_bits = (32 if version == 4 else 128) - self._prefixes[version]
+            total += (end >> host_bits) - (start >> host_bits) + 1
+        return total
+
+    def buckets(self) -> List[List[int]]:
+        """Build the [version, next, end, weight] cursor of every bucket."""
+        if self.bucket_count() > MAX_BUCKETS:
+            raise ValueError(
+                f"Interleaving would need more than {MAX_BUCKETS} buckets; use a shorter prefix"
+            )
+
+        cursors = []
+        for version, start, end in self._spans():
+            if start > end:
+                continue
+            if self._by_range:
+                cursors.append([version, start, end, 1])
+                continue
+            size = 1 << ((32 if version == 4 else 128) - self._prefixes[version])
+            while start <= end:
+                stop = min(end, (start | (size - 1)))
+                cursors.append([version, start, stop, 1])
+                start = stop + 1
+
+        if self._weights is not None:
+            for cursor in cursors:
+                weight = int(self._weights(ADDRESS_CLASSES[cursor[0]](cursor[1])))
+                if weight < 1:
+                    raise ValueError("Bucket weights must be positive integers")
+                cursor[3] = weight
+        return cursors
+
+    def count(self) -> int:
+        """Number of addresses emitted."""
+        return sum(end - start + 1 for _, start, end in self._spans() if start <= end)
+
+    def iter_int_ranges(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield (version, start, end) runs in round-robin order."""
+        cursors = deque(self.buckets())
+        while cursors:
+            cursor = cursors.popleft()
+            version, start, end, weight = cursor
+            stop = min(end, start + weight - 1)
+            yield version, start, stop
+            if stop < end:
+                cursor[1] = stop + 1
+                cursors.append(cursor)
+
+    def generate(self) -> Iterator[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+        """Yield addresses in round-robin order."""
+        for version, start, end in self.iter_int_ranges():
+            address = ADDRESS_CLASSES[version]
+            for value in range(start, end + 1):
+                yield address(value)
+
+    __iter__ = generate
+
+    def iter_arrays(self, chunk_size: int = ARRAY_CHUNK_SIZE):
+        """Yield the IPv4 schedule as uint32 NumPy arrays of at most `chunk_size`.
+
+        Produces the same order as ``iter_int_ranges``. While no bucket can
+        run out, whole rounds are laid out as a (rounds, buckets) grid in
+        one step. Rounds where buckets finish, and rounds larger than a
+        chunk, are laid out a chunk at a time.
+        """
+        import numpy as np
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        cursors = self.buckets()
+        if any(cursor[0] != 4 for cursor in cursors):
+            raise ValueError("iter_arrays only supports IPv4 buckets")
+        if not cursors:
+            return
+
+        current = np.array([cursor[1] for cursor in cursors], dtype=np.int64)
+        end = np.array([cursor[2] for cursor in cursors], dtype=np.int64)
+        weight = np.array([cursor[3] for cursor in cursors], dtype=np.int64)
+
+        while len(current):
+            round_size = int(weight.sum())
+            remaining = end - current + 1
+            rounds = min(int((remaining // weight).min()), chunk_size // round_size)
+
+            if rounds:
+                # Offset of each emitted address within its bucket's share of a round
+                within = np.arange(round_size) - np.repeat(np.cumsum(weight) - weight, weight)
+                base = current[None, :] + np.arange(rounds)[:, None] * weight[None, :]
+                grid = np.repeat(base, weight, axis=1) + within[None, :]
+                yield grid.astype(np.uint32).ravel()
+                current = current + rounds * weight
+            else:
+                take = np.minimum(weight, remaining)
+                # Position in the round of each bucket's first address
+                firsts = np.cumsum(take) - take
+                size = int(take.sum())
+                for first in range(0, size, chunk_size):
+                    positions = np.arange(first, min(first + chunk_size, size), dtype=np.int64)
+                    bucket = np.searchsorted(firsts, positions, side='right') - 1
+                    yield (current[bucket] + positions - firsts[bucket]).astype(np.uint32)
+                current = current + take
+
+            active = current <= end
+            if not active.all():
+                current, end, weight = current[active], end[active], weight[active]
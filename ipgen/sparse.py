@@ -0,0 +1,259 @@
+"""
+Structured subsets of large IPv6 prefixes that are too big to sweep in full.
+"""
+import ipaddress
+from bisect import bisect_right
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Largest expansion built without an explicit max_addresses: the size of
+# the whole IPv4 space, far beyond any accidental sweep of a small prefix
+MAX_ADDRESSES = 1 << 32
+
+# Most separate ranges built without an explicit max_ranges. Range lists
+# are what interval merging, the GUI summary and the CIDR output walk
+MAX_RANGES = 1 << 20
+
+# Interface IDs ::1 to ::ff, where statically numbered hosts usually sit
+LOW_BYTE_HOSTS = ((1, 0xFF),)
+
+# EUI-64 interface IDs carry 0xFFFE between the OUI and the NIC-specific bytes
+_EUI64_MARKER = 0xFFFE
+# Universal/local bit, inverted when a MAC address becomes an interface ID
+_UNIVERSAL_LOCAL = 0x020000
+
+Network = Union[str, ipaddress.IPv6Network]
+Seed = Union[str, int, ipaddress.IPv6Address]
+
+def _ipv6_network(network: Network) -> ipaddress.IPv6Network:
+    network = ipaddress.ip_network(network)
+    if network.version != 6:
+        raise ValueError(f"{network} is not an IPv6 network")
+    return network
+
+def _check_size(size: int, limit: Optional[int], unit: str, what: str) -> None:
+    """Refuse expansions past `limit` unless the caller raised it."""
+    if limit is not None and size > limit:
+        raise ValueError(
+            f"{what} would expand to {size} {unit}, more than max_{unit}={limit}; "
+            f"narrow it or pass a larger max_{unit} (None disables the check)"
+        )
+
+def _merge_pairs(pairs: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort (first, last) pairs and join the ones that overlap or touch."""
+    merged = []
+    for first, last in sorted(pairs):
+        if merged and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1] = (merged[-1][0], last)
+        else:
+            merged.append((first, last))
+    return merged
+
+def parse_oui(oui: Union[str, int]) -> int:
+    """Return a vendor OUI ("00:1a:2b", "00-1A-2B", "001a2b" or an int) as an integer."""
+    if isinstance(oui, int):
+        value = oui
+    else:
+        digits = oui.replace(':', '').replace('-', '').replace('.', '')
+        if len(digits) != 6:
+            raise ValueError(f"Invalid OUI: {oui}")
+        value = int(digits, 16)
+    if not 0 <= value <= 0xFFFFFF:
+        raise ValueError(f"Invalid OUI: {oui}")
+    return value
+
+def eui64_interface_id(oui: Union[str, int], nic: int) -> int:
+    """Return the modified EUI-64 interface ID of the MAC address `oui`:`nic`."""
+    if not 0 <= nic <= 0xFFFFFF:
+        raise ValueError(f"NIC-specific part must be 0 to 0xffffff, got {nic:#x}")
+    return (parse_oui(oui) ^ _UNIVERSAL_LOCAL) << 40 | _EUI64_MARKER << 24 | nic
+
+class SubnetSweep:
+    """The same interface IDs in every /`subnet_prefix` subnet of an IPv6 network.
+
+    ``SubnetSweep("2001:db8::/48")`` is ::1 to ::ff in each of the 65536
+    /64s, in subnet order. `hosts` lists (first, last) interface-ID
+    ranges, as integers counted from the start of each subnet. Only the
+    network and the host ranges are stored, so the count is exact and
+    any address can be found by index without expanding the sweep.
+
+    `max_addresses` and `max_ranges` guard against sweeping more than
+    intended, such as every /64 of a /32; pass None to allow any size.
+    """
+
+    def __init__(self, network: Network, hosts: Iterable[Sequence[int]] = LOW_BYTE_HOSTS,
+                 subnet_prefix: int = 64, max_addresses: Optional[int] = MAX_ADDRESSES,
+                 max_ranges: Optional[int] = MAX_RANGES):
+        network = _ipv6_network(network)
+        if not network.prefixlen <= subnet_prefix <= network.max_prefixlen:
+            raise ValueError(f"subnet_prefix must be between {network.prefixlen} and "
+                             f"{network.max_prefixlen} for {network}")
+        self.version = 6
+        self.network = network
+        self.subnet_prefix = subnet_prefix
+        self._host_bits = network.max_prefixlen - subnet_prefix
+
+        host_limit = (1 << self._host_bits) - 1
+        self.hosts = _merge_pairs((int(first), int(last)) for first, last in hosts)
+        for first, last in self.hosts:
+            if not 0 <= first <= last <= host_limit:
+                raise ValueError(f"Host range {first:#x}-{last:#x} does not fit a /{subnet_prefix}")
+        self._host_firsts = [first for first, _ in self.hosts]
+
+        # Addresses before each host range within a subnet, for indexing
+        self._host_offsets = []
+        size = 0
+        for first, last in self.hosts:
+            self._host_offsets.append(size)
+            size += last - first + 1
+        self.hosts_per_subnet = size
+        self.subnet_count = 1 << (subnet_prefix - network.prefixlen)
+        _check_size(self.num_addresses, max_addresses, 'addresses', repr(self))
+        _check_size(self.range_count, max_ranges, 'ranges', repr(self))
+
+    def __repr__(self) -> str:
+        hosts = ', '.join(f"({first:#x}, {last:#x})" for first, last in self.hosts)
+        return f"SubnetSweep('{self.network}', hosts=[{hosts}], subnet_prefix={self.subnet_prefix})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SubnetSweep):
+            return NotImplemented
+        return ((self.network, self.subnet_prefix, self.hosts)
+                == (other.network, other.subnet_prefix, other.hosts))
+
+    def __hash__(self) -> int:
+        return hash((self.network, self.subnet_prefix, tuple(self.hosts)))
+
+    @property
+    def num_addresses(self) -> int:
+        """Number of addresses in the sweep."""
+        return self.subnet_count * self.hosts_per_subnet
+
+    @property
+    def range_count(self) -> int:
+        """Number of ranges iter_int_ranges yields: one per host range per subnet."""
+        return self.subnet_count * len(self.hosts)
+
+    def to_dict(self) -> dict:
+        """Return the sweep as plain values, as saved by IPGenerator.to_json."""
+        return {
+            'network': str(self.network),
+            'subnet_prefix': self.subnet_prefix,
+            'hosts': [[first, last] for first, last in self.hosts],
+        }
+
+    def __getitem__(self, index: int) -> ipaddress.IPv6Address:
+        size = self.num_addresses
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("address out of range")
+        subnet, offset = divmod(index, self.hosts_per_subnet)
+        i = bisect_right(self._host_offsets, offset) - 1
+        host = self.hosts[i][0] + offset - self._host_offsets[i]
+        return ipaddress.IPv6Address(int(self.network.network_address) + (subnet << self._host_bits) + host)
+
+    def __contains__(self, address) -> bool:
+        if isinstance(address, str):
+            address = ipaddress.ip_address(address)
+        if not isinstance(address, int):
+            if address.version != 6:
+                return False
+            address = int(address)
+        offset = address - int(self.network.network_address)
+        if not 0 <= offset < self.network.num_addresses:
+            return False
+        host = offset & ((1 << self._host_bits) - 1)
+        i = bisect_right(self._host_firsts, host) - 1
+        return i >= 0 and host <= self.hosts[i][1]
+
+    def iter_int_ranges(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield (6, start, end) for every host range, subnet by subnet."""
+        base = int(self.network.network_address)
+        step = 1 << self._host_bits
+        for subnet in range(self.subnet_count):
+            for first, last in self.hosts:
+                yield 6, base + first, base + last
+            base += step
+
+    def generate(self) -> Iterator[ipaddress.IPv6Address]:
+        """Yield the addresses in ascending order."""
+        address = ipaddress.IPv6Address
+        for _, start, end in self.iter_int_ranges():
+            for value in range(start, end + 1):
+                yield address(value)
+
+    __iter__ = generate
+
+    def count(self) -> int:
+        """Number of addresses generate() yields."""
+        return self.num_addresses
+
+def low_byte_hosts(network: Network, last: int = 0xFF, subnet_prefix: int = 64,
+                   max_addresses: Optional[int] = MAX_ADDRESSES,
+                   max_ranges: Optional[int] = MAX_RANGES) -> SubnetSweep:
+    """Hosts ::1 to ::`last` in every /`subnet_prefix` of `network`.
+
+    A /64 gives one subnet; a /48 sweeps all 65536 of its /64s.
+    """
+    return SubnetSweep(network, [(1, last)], max(subnet_prefix, _ipv6_network(network).prefixlen),
+                       max_addresses, max_ranges)
+
+def eui64_hosts(network: Network, ouis: Iterable[Union[str, int]],
+                nics: Tuple[int, int] = (0, 0xFFFFFF), subnet_prefix: int = 64,
+                max_addresses: Optional[int] = MAX_ADDRESSES,
+                max_ranges: Optional[int] = MAX_RANGES) -> SubnetSweep:
+    """SLAAC addresses derived from MAC addresses of the given vendor OUIs.
+
+    Every OUI contributes the interface IDs of its NIC-specific range
+    `nics` (all 2**24 by default) in each /`subnet_prefix` of `network`.
+    Narrowing `nics` to the block a vendor actually ships keeps the sweep
+    small.
+    """
+    first, last = nics
+    hosts = [(eui64_interface_id(oui, first), eui64_interface_id(oui, last)) for oui in ouis]
+    if not hosts:
+        raise ValueError("At least one OUI is required")
+    return SubnetSweep(network, hosts, subnet_prefix, max_addresses, max_ranges)
+
+def seed_ranges(seeds: Iterable[Seed], radius: int = 16, subnet_radius: int = 0,
+                subnet_prefix: int = 64, max_addresses: Optional[int] = MAX_ADDRESSES,
+                max_ranges: Optional[int] = MAX_RANGES) -> List[Tuple[int, int]]:
+    """Return merged (start, end) integer ranges of addresses near known IPv6 seeds.
+
+    Each seed contributes the `radius` addresses either side of it, kept
+    within its /`subnet_prefix`, and the same window around the same
+    interface ID in the `subnet_radius` neighbouring subnets either side.
+    Overlapping windows are merged, so the ranges are disjoint and their
+    sizes add up to an exact count.
+    """
+    if radius < 0 or subnet_radius < 0:
+        raise ValueError("radius and subnet_radius must not be negative")
+    if not 0 <= subnet_prefix <= 128:
+        raise ValueError("subnet_prefix must be between 0 and 128")
+    host_bits = 128 - subnet_prefix
+    step = 1 << host_bits
+    host_mask = step - 1
+    top = (1 << 128) - 1
+
+    seeds = list(seeds)
+    # Check the number of windows before building them; merging only lowers it
+    _check_size(len(seeds) * (2 * subnet_radius + 1), max_ranges, 'ranges', f"{len(seeds)} seeds")
+    windows = []
+    for seed in seeds:
+        if not isinstance(seed, int):
+            seed = ipaddress.ip_address(seed)
+            if seed.version != 6:
+                raise ValueError(f"{seed} is not an IPv6 address")
+            seed = int(seed)
+        for shift in range(-subnet_radius, subnet_radius + 1):
+            center = seed + shift * step
+            if not 0 <= center <= top:
+                continue
+            subnet = center & ~host_mask
+            windows.append((max(center - radius, subnet), min(center + radius, subnet | host_mask)))
+
+    ranges = _merge_pairs(windows)
+    _check_size(sum(end - start + 1 for start, end in ranges), max_addresses, 'addresses',
+                f"{len(seeds)} seeds")
+    return ranges
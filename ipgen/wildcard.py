@@ -0,0 +1,170 @@
+"""
+Wildcard (ACL-style) address patterns with arbitrary, non-contiguous free bits.
+"""
+import ipaddress
+from typing import Iterator, List, Optional, Tuple, Union
+
+from .formatters import ADDRESS_CLASSES, ARRAY_CHUNK_SIZE
+from .sparse import MAX_RANGES, _check_size
+
+Address = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+def _bit_runs(bits: int) -> List[Tuple[int, int]]:
+    """Return the (shift, width) of each run of set bits, lowest first."""
+    runs = []
+    shift = 0
+    while bits:
+        if bits & 1:
+            width = 0
+            while bits & 1:
+                bits >>= 1
+                width += 1
+            runs.append((shift, width))
+            shift += width
+        else:
+            bits >>= 1
+            shift += 1
+    return runs
+
+class WildcardMask:
+    """The addresses matching `address` under a wildcard mask.
+
+    A set bit in `wildcard` is a "don't care" bit, as in router ACLs, so
+    ``WildcardMask("10.0.0.1", "0.0.255.0")`` is 10.0.0.1, 10.0.1.1, ...,
+    10.0.255.1. Only the fixed base and the runs of free bits are stored.
+    The n-th address is found by scattering the bits of n into the free
+    runs, which keeps addresses in ascending order.
+
+    `max_ranges` refuses masks whose range cover (see iter_int_ranges) is
+    longer, such as "0.255.255.254" with its 2**23 ranges, since merging,
+    diffing and the GUI summary walk every range; pass None to allow any.
+    """
+
+    def __init__(self, address: Union[str, Address], wildcard: Union[str, Address],
+                 max_ranges: Optional[int] = MAX_RANGES):
+        address = ipaddress.ip_address(address)
+        wildcard = ipaddress.ip_address(wildcard)
+        if address.version != wildcard.version:
+            raise ValueError(f"{address} and wildcard {wildcard} are different IP versions")
+
+        self.version = address.version
+        self.free = int(wildcard)
+        self.base = int(address) & ~self.free
+        # (index bit offset, width, address bit shift) for every free run
+        self._runs = []
+        offset = 0
+        for shift, width in _bit_runs(self.free):
+            self._runs.append((offset, width, shift))
+            offset += width
+        self._free_count = offset
+        _check_size(self.range_count, max_ranges, 'ranges', repr(self))
+
+    def __repr__(self) -> str:
+        return f"WildcardMask('{self.address}', '{self.wildcard}')"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, WildcardMask):
+            return NotImplemented
+        return (self.version, self.base, self.free) == (other.version, other.base, other.free)
+
+    def __hash__(self) -> int:
+        return hash((self.version, self.base, self.free))
+
+    @property
+    def address(self) -> Address:
+        """The first matching address (free bits cleared)."""
+        return ADDRESS_CLASSES[self.version](self.base)
+
+    @property
+    def wildcard(self) -> Address:
+        """The wildcard mask, with free bits set."""
+        return ADDRESS_CLASSES[self.version](self.free)
+
+    @property
+    def num_addresses(self) -> int:
+        """Number of matching addresses."""
+        return 1 << self._free_count
+
+    @property
+    def is_contiguous(self) -> bool:
+        """True when the free bits are the low bits, i.e. the pattern is one CIDR block."""
+        return self.free & (self.free + 1) == 0
+
+    @property
+    def range_count(self) -> int:
+        """Number of ranges in the minimal range cover (see iter_int_ranges)."""
+        return self.num_addresses >> self._block_bits()
+
+    def _block_bits(self) -> int:
+        """Width of the free run at bit 0, which makes each range contiguous."""
+        if self._runs and self._runs[0][2] == 0:
+            return self._runs[0][1]
+        return 0
+
+    def scatter(self, index):
+        """Return the address integer at `index`.
+
+        `index` may also be a NumPy integer array (IPv4 only), in which
+        case an array of addresses is returned.
+        """
+        value = self.base
+        for offset, width, shift in self._runs:
+            value = value | (((index >> offset) & ((1 << width) - 1)) << shift)
+        return value
+
+    def __getitem__(self, index: int) -> Address:
+        size = self.num_addresses
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("address out of range")
+        return ADDRESS_CLASSES[self.version](self.scatter(index))
+
+    def __contains__(self, address) -> bool:
+        if isinstance(address, str):
+            address = ipaddress.ip_address(address)
+        if isinstance(address, int):
+            value = address
+        elif address.version == self.version:
+            value = int(address)
+        else:
+            return False
+        return value & ~self.free == self.base
+
+    def iter_int_ranges(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield the minimal cover as ascending (version, start, end) tuples.
+
+        Each range spans the free run at bit 0 (a single address when bit 0
+        is fixed); every other combination of free bits starts a new range.
+        """
+        block_bits = self._block_bits()
+        block = (1 << block_bits) - 1
+        version = self.version
+        for index in range(self.range_count):
+            start = self.scatter(index << block_bits)
+            yield version, start, start | block
+
+    def generate(self) -> Iterator[Address]:
+        """Yield matching addresses in ascending order."""
+        address = ADDRESS_CLASSES[self.version]
+        for _, start, end in self.iter_int_ranges():
+            for value in range(start, end + 1):
+                yield address(value)
+
+    __iter__ = generate
+
+    def count(self) -> int:
+        """Number of addresses generate() yields."""
+        return self.num_addresses
+
+    def iter_arrays(self, chunk_size: int = ARRAY_CHUNK_SIZE):
+        """Yield matching IPv4 addresses as ascending uint32 NumPy arrays."""
+        import numpy as np
+
+        if self.version != 4:
+            raise ValueError("iter_arrays only supports IPv4 patterns")
+        size = self.num_addresses
+        for first in range(0, size, chunk_size):
+            index = np.arange(first, min(first + chunk_size, size), dtype=np.int64)
+            # A mask with no free bits scatters to a plain integer
+            yield np.broadcast_to(self.scatter(index), index.shape).astype(np.uint32)
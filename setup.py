@@ -22,12 +22,17 @@ setup(
     install_requires=[
         "ipaddress>=1.0.23",
         "pandas>=2.0.0",
+        "numpy>=1.24.0",
         "openpyxl>=3.1.0",
         "pyyaml>=6.0.1",
         "python-dotenv>=1.0.0",
     ],
+    extras_require={
+        "arrow": ["pyarrow>=12.0.0"],
+    },
     entry_points={
         "console_scripts": [
+            "ipgen=ipgen.cli:main",
             "ipgen-gui=ipgen.gui:main",
         ],
     },
@@ -2,16 +2,26 @@
 """
 Test script for IPGen functionality.
 """
+import io
 import os
 import tempfile
 import ipaddress
 from ipgen import (
     IPGenerator,
+    WildcardMask,
     parse_cidr,
     parse_range,
     parse_wildcard,
     parse_gateway_subnet,
+    parse_json,
+    parse_yaml,
+    parse_sql,
+    parse_many,
+    to_yaml,
+    to_sql,
+    to_stream,
 )
+from ipgen.json_stream import iter_json_arrays
 
 def test_single_ip():
     """Test adding a single IP."""
@@ -51,6 +61,103 @@ def test_wildcard():
     assert str(ips[-1]) == "192.168.1.255"
     print("✓ Wildcard test passed")
 
+def test_wildcard_mask():
+    """Test non-contiguous wildcard masks."""
+    # Third octet is free: 10.0.0.1, 10.0.1.1, ..., 10.0.255.1
+    generator = parse_wildcard("10.0.0.1", "0.0.255.0")
+    assert generator.count() == 256
+    ips = list(generator.generate())
+    assert str(ips[1]) == "10.0.1.1"
+    assert str(ips[-1]) == "10.0.255.1"
+    
+    mask = WildcardMask("10.0.0.0", "0.0.2.3")
+    assert mask.num_addresses == 8
+    assert mask.range_count == 2
+    assert str(mask[5]) == "10.0.2.1"
+    assert "10.0.2.3" in mask and "10.0.1.0" not in mask
+    assert list(mask.iter_int_ranges()) == [
+        (4, int(ipaddress.IPv4Address("10.0.0.0")), int(ipaddress.IPv4Address("10.0.0.3"))),
+        (4, int(ipaddress.IPv4Address("10.0.2.0")), int(ipaddress.IPv4Address("10.0.2.3"))),
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_file = os.path.join(tmpdir, "wildcards.json")
+        generator.to_json(json_file)
+        assert parse_json(json_file).count() == 256
+        
+        # Masks that split into too many ranges are refused unless allowed
+        try:
+            generator.add_wildcard("10.0.0.0", "0.255.255.254")
+            assert False, "2**23 ranges were accepted"
+        except ValueError as e:
+            assert "max_ranges" in str(e)
+        generator.add_wildcard("10.0.0.0", "0.63.255.254", max_ranges=None)
+        generator.to_json(json_file)
+        assert parse_json(json_file).count() == 256 + 2 ** 21
+    print("✓ Wildcard mask test passed")
+
+def test_bulk_ingestion():
+    """Test adding many addresses at once."""
+    import numpy as np
+    
+    generator = IPGenerator()
+    generator.add_ips(["10.0.0.3", "10.0.0.1", "10.0.0.2", "10.0.0.2", "10.0.0.9", "2001:db8::1"])
+    assert generator.count() == 5
+    # IPv6 is kept with the individual addresses, ahead of the IPv4 runs
+    assert [str(ip) for ip in generator.generate()] == [
+        "2001:db8::1", "10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.9"
+    ]
+    
+    values = np.arange(167772160, 167772160 + 1000, dtype=np.uint32)[::-1]
+    generator = IPGenerator.from_array(values)
+    assert generator.count() == 1000
+    assert generator.to_dict()["ranges"] == [("10.0.0.0", "10.0.3.231")]
+    
+    generator = IPGenerator.from_ints([1, 2, 3, 7])
+    assert list(generator.iter_int_ranges()) == [(4, 1, 3), (4, 7, 7)]
+    
+    # Merged runs are combined with the ones already added
+    generator = IPGenerator()
+    generator.add_ips(["10.0.0.9", "10.0.0.1"])
+    other = IPGenerator()
+    other.add_ips(["10.0.0.2", "10.0.0.9"])
+    generator.merge(other)
+    assert [str(ip) for ip in generator.generate()] == ["10.0.0.1", "10.0.0.2", "10.0.0.9"]
+    
+    # Overlapping calls are deduplicated whether or not the generator was read in between
+    for read_between in (False, True):
+        generator = IPGenerator()
+        generator.add_ips(np.arange(10, 20))
+        if read_between:
+            assert generator.count() == 10
+        generator.add_ips(np.arange(15, 25))
+        assert generator.count() == 15
+        assert [int(ip) for ip in generator.generate()] == list(range(10, 25))
+    
+    # Loading in many small batches, as the parsers do, stays roughly linear
+    import time
+    values = np.random.default_rng(0).permutation(1 << 24)[:800000] * 64
+    timings = []
+    for size in (200000, 800000):
+        generator = IPGenerator()
+        start = time.perf_counter()
+        for batch in np.array_split(values[:size], size // 400):
+            generator.add_ips(batch)
+        assert generator.count() == size
+        timings.append(time.perf_counter() - start)
+    assert timings[1] < 8 * timings[0], timings
+    
+    # NumPy integer scalars are IPv4 integers; anything unparsable is named
+    generator = IPGenerator()
+    generator.add_ips([np.int64(5), np.uint32(6), "10.0.0.1"])
+    assert list(generator.iter_int_ranges()) == [(4, 5, 6), (4, 167772161, 167772161)]
+    try:
+        generator.add_ips(["10.0.0.2", float("nan")])
+        assert False, "NaN was accepted as an address"
+    except ValueError as e:
+        assert "nan" in str(e)
+    print("✓ Bulk ingestion test passed")
+
 def test_gateway_subnet():
     """Test adding a gateway/subnet."""
     generator = parse_gateway_subnet("192.168.1.1", "255.255.255.0")
@@ -92,6 +199,636 @@ def test_output_formats():
     
     print("✓ Output formats test passed")
 
+def test_stream_formats():
+    """Test streaming output through the command-line formats."""
+    generator = parse_range("10.0.0.254", "10.0.1.1")
+    generator.add_ip("192.168.1.1")
+    
+    out = io.BytesIO()
+    generator.to_stream(out)
+    assert out.getvalue().decode().split() == [
+        "192.168.1.1", "10.0.0.254", "10.0.0.255", "10.0.1.0", "10.0.1.1"
+    ]
+    
+    out = io.BytesIO()
+    generator.to_stream(out, "jsonl")
+    assert out.getvalue().splitlines()[1] == b'"10.0.0.254"'
+    
+    out = io.BytesIO()
+    generator.to_stream(out, "cidr")
+    assert out.getvalue().decode().split() == [
+        "192.168.1.1/32", "10.0.0.254/31", "10.0.1.0/31"
+    ]
+    
+    out = io.BytesIO()
+    parse_cidr("10.0.0.0/15").to_stream(out, "binary")
+    data = out.getvalue()
+    assert len(data) == 4 * 131072
+    assert data[-4:] == bytes([10, 1, 255, 255])
+    
+    # Unframed 4- and 16-byte records cannot share a stream
+    mixed = parse_cidr("10.0.0.0/31")
+    mixed.add_ip("::1")
+    try:
+        mixed.to_stream(io.BytesIO(), "binary")
+        assert False, "binary output mixed IPv4 and IPv6"
+    except ValueError as e:
+        assert "mix" in str(e)
+    
+    out = io.BytesIO()
+    parse_cidr("10.0.0.0/15").to_stream(out)
+    lines = out.getvalue().split(b"\n")
+    assert len(lines) == 131073
+    assert lines[65536] == b"10.1.0.0"
+    print("✓ Stream formats test passed")
+
+def test_parse_json_streaming():
+    """Test reading a JSON file in chunks smaller than its values."""
+    data = (
+        '{"comment": {"skip": ["1.1.1.1", {"nested": "]"}]},\n'
+        ' "ip_addresses": ["192.168.1.1", "192.168.1.2"],\n'
+        ' "ranges": [["10.0.0.1", "10.0.0.3"]]}'
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_file = os.path.join(tmpdir, "input.json")
+        with open(json_file, "w") as f:
+            f.write(data)
+        
+        for chunk_size in (1, 3, 7, 64):
+            generator = parse_json(json_file, chunk_size=chunk_size, batch_size=1)
+            assert [str(ip) for ip in generator.generate()] == [
+                "192.168.1.1", "192.168.1.2", "10.0.0.1", "10.0.0.2", "10.0.0.3"
+            ]
+        
+        # Numbers split inside a fraction or exponent are read whole
+        with open(json_file, "w") as f:
+            f.write('{"x": [1.25, 1.5e10, -3E-2], "ip_addresses": ["192.168.1.1"]}')
+        for chunk_size in range(1, 16):
+            generator = parse_json(json_file, chunk_size=chunk_size)
+            assert [str(ip) for ip in generator.generate()] == ["192.168.1.1"]
+        with open(json_file) as f:
+            assert [item for _, item in iter_json_arrays(f, ["x"], chunk_size=3)] == [1.25, 1.5e10, -3e-2]
+        
+        with open(json_file, "w") as f:
+            f.write('{"ip_addresses": ["192.168.1.1" "192.168.1.2"]}')
+        try:
+            parse_json(json_file)
+            assert False, "malformed JSON was accepted"
+        except ValueError:
+            pass
+    print("✓ Streaming JSON test passed")
+
+def test_yaml_round_trip():
+    """Test that every YAML writer produces files parse_yaml reads back."""
+    generator = parse_cidr("10.0.0.0/30")
+    generator.add_ip("1:2:3:4:5:6:7:8")
+    expected = [str(ip) for ip in generator.generate()]
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yaml_file = os.path.join(tmpdir, "test.yaml")
+        
+        generator.to_yaml(yaml_file)
+        assert [str(ip) for ip in parse_yaml(yaml_file).generate()] == expected
+        
+        generator.to_yaml(yaml_file, expand=True)
+        assert [str(ip) for ip in parse_yaml(yaml_file).generate()] == expected
+        
+        to_yaml(generator.generate(), yaml_file, expand=False)
+        parsed = parse_yaml(yaml_file)
+        assert len(parsed._ip_ranges) == 1
+        assert sorted(str(ip) for ip in parsed.generate()) == sorted(expected)
+    print("✓ YAML round trip test passed")
+
+def test_sql_round_trip():
+    """Test writing to and reading from a SQLite database."""
+    generator = parse_cidr("10.0.0.0/30")
+    generator.add_ip("2001:db8::1")
+    expected = sorted(str(ip) for ip in generator.generate())
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        url = f"sqlite:///{os.path.join(tmpdir, 'test.db')}"
+        
+        assert generator.to_sql(url, "target_ranges") == 2
+        assert sorted(str(ip) for ip in parse_sql(url, "target_ranges").generate()) == expected
+        
+        assert to_sql(generator.generate(), url, "targets", batch_size=3) == 5
+        parsed = parse_sql(url, "targets", batch_size=2)
+        assert sorted(str(ip) for ip in parsed.generate()) == expected
+    print("✓ SQL round trip test passed")
+
+def test_columnar_formats():
+    """Test NumPy and Arrow integer exports."""
+    import numpy as np
+    
+    generator = parse_cidr("10.0.0.0/31")
+    generator.add_ip("192.168.1.1")
+    expected = [int(ip) for ip in generator.generate()]
+    
+    ipv6 = parse_range("2001:db8::ffff:ffff:ffff:ffff", "2001:db8:0:1::")
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        npy_file = os.path.join(tmpdir, "test.npy")
+        assert generator.to_npy(npy_file) == 3
+        array = np.load(npy_file, mmap_mode="r")
+        assert array.dtype == np.uint32
+        assert array.tolist() == expected
+        
+        ipv6.to_npy(npy_file)
+        pairs = np.load(npy_file).tolist()
+        assert [(high << 64) | low for high, low in pairs] == [int(ip) for ip in ipv6.generate()]
+        
+        # A mixed generator exports one version at a time
+        mixed = IPGenerator()
+        mixed.merge(generator)
+        mixed.merge(ipv6)
+        try:
+            mixed.to_npy(npy_file)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        assert mixed.to_npy(npy_file, version=4) == 3
+        assert np.load(npy_file).tolist() == expected
+        assert mixed.to_npy(npy_file, version=6) == 2
+        
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("  (pyarrow not installed, skipping Parquet)")
+        else:
+            parquet_file = os.path.join(tmpdir, "test.parquet")
+            generator.to_parquet(parquet_file)
+            assert pq.read_table(parquet_file).column("ip").to_pylist() == expected
+    print("✓ Columnar formats test passed")
+
+def test_contains_many():
+    """Test bulk membership against merged intervals."""
+    import numpy as np
+    
+    generator = parse_cidr("10.0.0.0/30")
+    generator.add_range("10.0.0.4", "10.0.0.9")
+    generator.add_cidr("192.168.0.0/24")
+    generator.add_ip("2001:db8::1")
+    
+    starts, ends = generator.intervals()
+    assert len(starts) == 2  # 10.0.0.0-10.0.0.9 and 192.168.0.0/24
+    
+    queries = np.array([
+        int(ipaddress.ip_address(ip))
+        for ip in ["10.0.0.0", "10.0.0.9", "10.0.0.10", "192.168.0.77", "8.8.8.8"]
+    ], dtype=np.uint32)
+    mask, index = generator.contains_many(queries, return_index=True)
+    assert mask.tolist() == [True, True, False, True, False]
+    assert index.tolist() == [0, 0, -1, 1, -1]
+    
+    mask = generator.contains_many(["2001:db8::1", "2001:db8::2", "10.0.0.3"])
+    assert mask.tolist() == [True, False, True]
+    
+    # NumPy integer scalars, string arrays and unparsable items
+    assert generator.contains_many(list(queries)).tolist() == [True, True, False, True, False]
+    mask = generator.contains_many(np.array(["10.0.0.1", "8.8.8.8", "192.168.0.1"]))
+    assert mask.tolist() == [True, False, True]
+    try:
+        generator.contains_many(["10.0.0.1", None])
+        assert False, "None was accepted as an address"
+    except ValueError as e:
+        assert "None" in str(e)
+    print("✓ contains_many test passed")
+
+def test_diff():
+    """Test diffing generators and snapshots."""
+    old = parse_cidr("10.0.0.0/24")
+    new = parse_cidr("10.0.0.0/25")
+    new.add_range("10.0.1.0", "10.0.1.3")
+    
+    added, removed = new.diff(old)
+    assert added.count() == 4
+    assert removed.count() == 128
+    assert str(next(removed.generate())) == "10.0.0.128"
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot = os.path.join(tmpdir, "snapshot.json")
+        added, removed = old.diff_snapshot(snapshot)
+        assert (added.count(), removed.count()) == (256, 0)
+        added, removed = new.diff_snapshot(snapshot)
+        assert (added.count(), removed.count()) == (4, 128)
+        added, removed = new.diff_snapshot(snapshot)
+        assert (added.count(), removed.count()) == (0, 0)
+    print("✓ Diff test passed")
+
+def test_gui_summary():
+    """Test the GUI's incremental summary and preview index."""
+    from ipgen.gui import GeneratorSummary, PreviewIndex
+    
+    generator = IPGenerator()
+    summary = GeneratorSummary()
+    index = PreviewIndex()
+    
+    # One step per section: singles, add_ips runs, ranges, wildcard patterns
+    generator.add_ip("192.168.1.1")
+    generator.add_ip("10.0.0.5")
+    assert summary.sync(generator) == 0
+    assert (summary.count, summary.unique_count) == (2, 2)
+    
+    generator.add_ips(["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.5", "10.0.0.10"])
+    assert summary.sync(generator) == 1
+    assert (summary.count, summary.unique_count) == (7, 6)
+    
+    generator.add_range("10.0.0.4", "10.0.0.8")
+    assert summary.sync(generator) == 1
+    assert (summary.count, summary.unique_count) == (12, 10)
+    
+    generator.add_wildcard("172.16.0.0", "0.0.1.1")
+    assert summary.sync(generator) == 0
+    assert (summary.count, summary.unique_count) == (16, 14)
+    assert summary.count == generator.count()
+    assert [(str(start), str(end)) for start, end in summary.ranges()] == [
+        ("10.0.0.1", "10.0.0.8"),
+        ("10.0.0.10", "10.0.0.10"),
+        ("172.16.0.0", "172.16.0.1"),
+        ("172.16.1.0", "172.16.1.1"),
+        ("192.168.1.1", "192.168.1.1"),
+    ]
+    
+    # Nothing new since the last sync
+    assert summary.sync(generator) == 0
+    assert summary.count == 16
+    
+    # Rows across section boundaries match generate()
+    index.sync(generator)
+    expected = [str(ip) for ip in generator.generate()]
+    assert index.size() == len(expected) == 16
+    assert expected[:3] == ["192.168.1.1", "10.0.0.5", "10.0.0.1"]
+    for position in range(len(expected) + 1):
+        for count in (1, 3, 16):
+            assert index.rows(position, count) == expected[position:position + count]
+    
+    # Later additions extend the index in place
+    generator.add_ip("10.0.0.9")
+    index.sync(generator)
+    assert index.rows(0, 100) == [str(ip) for ip in generator.generate()]
+    
+    # Later add_ips calls overlapping earlier runs replace them with their union
+    generator.add_ips(["10.0.0.2", "10.0.0.20"])
+    index.sync(generator)
+    assert index.rows(0, 100) == [str(ip) for ip in generator.generate()]
+    # add_ips itself drops the repeated 10.0.0.2, so only 10.0.0.9 and .20 are new
+    assert summary.sync(generator) == 0
+    assert (summary.count, summary.unique_count) == (18, 16)
+    assert summary.count == generator.count()
+    
+    # Several new IPv6 ranges in one sync are merged together
+    generator = IPGenerator()
+    generator.add_range("2001:db8::1", "2001:db8::10")
+    generator.add_range("2001:db8::8", "2001:db8::20")
+    generator.add_ip("2001:db8::21")
+    summary = GeneratorSummary()
+    assert summary.sync(generator) == 9
+    assert (summary.count, summary.unique_count, summary.range_count) == (42, 33, 1)
+    
+    # A /64 has more rows than len() can report
+    generator = IPGenerator()
+    generator.add_cidr("2001:db8::/64")
+    summary.sync(generator)
+    index.sync(generator)
+    assert summary.count == index.size() == 2 ** 64
+    assert index.rows(2 ** 64 - 2, 5) == ["2001:db8::ffff:ffff:ffff:fffe", "2001:db8::ffff:ffff:ffff:ffff"]
+    print("✓ GUI summary test passed")
+
+def run_cli(argv):
+    """Run the ipgen command, returning its exit code and what it wrote to stdout."""
+    import contextlib
+    import sys
+    from ipgen.cli import main
+    
+    stderr = io.StringIO()
+    with tempfile.TemporaryFile() as out:
+        # main writes to the descriptor behind sys.stdout, which test runners may replace
+        fd = sys.stdout.fileno()
+        sys.stdout.flush()
+        saved = os.dup(fd)
+        os.dup2(out.fileno(), fd)
+        try:
+            with contextlib.redirect_stderr(stderr):
+                code = main(argv)
+        except SystemExit as e:
+            code = e.code
+        finally:
+            os.dup2(saved, fd)
+            os.close(saved)
+        out.seek(0)
+        return code, out.read()
+
+def test_cli():
+    """Test argument parsing, file merging and compressed output of the ipgen command."""
+    import gzip
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first = os.path.join(tmpdir, "first.txt")
+        second = os.path.join(tmpdir, "second.txt")
+        ranges = os.path.join(tmpdir, "ranges.json")
+        with open(first, "w") as f:
+            f.write("10.0.0.9\n# comment\n10.0.0.1\n")
+        with open(second, "w") as f:
+            f.write("10.0.0.5\n10.0.0.4\n")
+        parse_range("10.0.0.4", "10.0.0.5").to_json(ranges)
+        
+        assert run_cli(["10.0.0.0/31"]) == (0, b"10.0.0.0\n10.0.0.1\n")
+        
+        # Targets may follow options
+        code, output = run_cli(["-i", ranges, "10.0.0.7", "-f", "cidr"])
+        assert code == 0
+        assert output == b"10.0.0.7/32\n10.0.0.4/31\n"
+        
+        # Files are merged in command-line order, positional ones before -i
+        code, output = run_cli([second, "192.168.0.1", first])
+        assert output.split() == [b"10.0.0.5", b"10.0.0.4", b"192.168.0.1", b"10.0.0.9", b"10.0.0.1"]
+        code, output = run_cli(["-i", second, first])
+        assert output.split() == [b"10.0.0.9", b"10.0.0.1", b"10.0.0.5", b"10.0.0.4"]
+        
+        for compress, threads in (("gzip", []), ("gzip", ["--threads", "2"]), ("xz", [])):
+            code, output = run_cli(["10.0.0.0/30", "-z", compress] + threads)
+            assert code == 0
+            if compress == "gzip":
+                assert gzip.decompress(output) == b"10.0.0.0\n10.0.0.1\n10.0.0.2\n10.0.0.3\n"
+            else:
+                import lzma
+                assert lzma.decompress(output) == b"10.0.0.0\n10.0.0.1\n10.0.0.2\n10.0.0.3\n"
+        
+        # Usage errors exit with status 2
+        assert run_cli([])[0] == 2
+        assert run_cli(["10.0.0.0/30", "--threads", "2"])[0] == 2
+        assert run_cli(["10.0.0.0/30", "-z", "bz2", "--threads", "2"])[0] == 2
+        assert run_cli(["not-an-ip"])[0] == 2
+        assert run_cli(["10.0.0.0/8", "--interleave", "40"])[0] == 2
+        assert run_cli(["::1", "1.2.3.4", "-f", "binary"]) == (2, b"")
+        assert run_cli(["::1", "-f", "binary"]) == (0, bytes(15) + b"\x01")
+    print("✓ CLI test passed")
+
+def test_interleave():
+    """Test round-robin interleaving across subnets."""
+    generator = parse_cidr("10.0.0.0/31")
+    generator.add_cidr("10.0.1.0/31")
+    
+    schedule = generator.interleave(24)
+    assert schedule.count() == 4
+    expected = ["10.0.0.0", "10.0.1.0", "10.0.0.1", "10.0.1.1"]
+    assert [str(ip) for ip in schedule.generate()] == expected
+    
+    addresses = [str(ipaddress.IPv4Address(int(value)))
+                 for array in schedule.iter_arrays() for value in array]
+    assert addresses == expected
+    
+    # Two addresses per round from 10.0.0.0/24, one from the rest
+    weighted = generator.interleave(24, weights=lambda ip: 2 if ip.packed[2] == 0 else 1)
+    expected = ["10.0.0.0", "10.0.0.1", "10.0.1.0", "10.0.1.1"]
+    assert [str(ip) for ip in weighted.generate()] == expected
+    
+    # Rounds larger than a chunk are split across chunks in the same order
+    heavy = generator.interleave(24, weights=lambda ip: 2)
+    chunks = list(heavy.iter_arrays(chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    assert [str(ipaddress.IPv4Address(int(value))) for chunk in chunks for value in chunk] == expected
+    
+    buffer = io.BytesIO()
+    to_stream(schedule, buffer)
+    assert buffer.getvalue() == b"10.0.0.0\n10.0.1.0\n10.0.0.1\n10.0.1.1\n"
+    
+    for prefix, prefix6 in ((40, 64), (-1, 64), (24, 129)):
+        try:
+            generator.interleave(prefix, prefix6)
+            assert False, f"prefix {prefix}, prefix6 {prefix6} was accepted"
+        except ValueError as e:
+            assert "must be between" in str(e)
+    
+    # Schedules iterate, so the formatters that take address lists accept them
+    from ipgen.formatters import to_csv, to_json, to_list
+    expected = ["10.0.0.0", "10.0.1.0", "10.0.0.1", "10.0.1.1"]
+    assert to_list(schedule) == expected
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_file = os.path.join(tmpdir, "schedule.csv")
+        json_file = os.path.join(tmpdir, "schedule.json")
+        to_csv(schedule, csv_file)
+        to_json(schedule, json_file)
+        with open(csv_file) as f:
+            assert f.read().split() == ["ip_address"] + expected
+        assert [str(ip) for ip in parse_json(json_file).generate()] == sorted(expected)
+    print("✓ Interleave test passed")
+
+def test_parse_many():
+    """Test concurrent parsing of several input files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_file = os.path.join(tmpdir, "a.json")
+        yaml_file = os.path.join(tmpdir, "b.yaml")
+        text_file = os.path.join(tmpdir, "c.txt")
+        parse_cidr("10.0.0.0/30").to_json(json_file)
+        parse_range("10.0.1.0", "10.0.1.1").to_yaml(yaml_file)
+        with open(text_file, "w") as f:
+            f.write("# targets\n192.168.0.1\n10.0.2.0/31\n")
+        missing = os.path.join(tmpdir, "missing.csv")
+        
+        generator, results = parse_many([json_file, yaml_file, text_file, missing], workers=2)
+        assert [r.format for r in results] == ["json", "yaml", "text", "csv"]
+        assert [r.count for r in results] == [4, 2, 3, 0]
+        assert results[-1].error is not None
+        assert all(r.error is None and r.seconds >= 0 for r in results[:3])
+        ips = [str(ip) for ip in generator.generate()]
+        assert ips[0] == "192.168.0.1"
+        assert ips[1:] == ["10.0.0.0", "10.0.0.1", "10.0.0.2", "10.0.0.3",
+                           "10.0.1.0", "10.0.1.1", "10.0.2.0", "10.0.2.1"]
+    print("✓ parse_many test passed")
+
+def test_compressed_files():
+    """Test writing and reading back gzip, bz2 and xz files."""
+    import gzip
+    from ipgen import parse_file
+    from ipgen.compression import ParallelGzipWriter, open_output
+    
+    generator = parse_cidr("10.0.0.0/28")
+    generator.add_ip("2001:db8::1")
+    expected = [str(ip) for ip in generator.generate()]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for suffix in (".gz", ".bz2", ".xz"):
+            json_file = os.path.join(tmpdir, "ips.json" + suffix)
+            yaml_file = os.path.join(tmpdir, "ips.yaml" + suffix)
+            generator.to_json(json_file)
+            generator.to_yaml(yaml_file, expand=True)
+            for path in (json_file, yaml_file):
+                assert sorted(str(ip) for ip in parse_file(path).generate()) == sorted(expected)
+        
+        # Zip CSV files are left to pandas, as before; other formats reject them
+        import zipfile
+        import pandas as pd
+        from ipgen.parsers import parse_csv
+        zip_file = os.path.join(tmpdir, "ips.csv.zip")
+        generator.to_csv(zip_file)
+        assert zipfile.is_zipfile(zip_file)
+        assert [str(ip) for ip in parse_file(zip_file).generate()] == expected
+        pd.DataFrame({"ip_address": ["10.9.0.1", "10.9.0.2"]}).to_csv(zip_file, index=False)
+        assert parse_csv(zip_file).count() == 2
+        try:
+            generator.to_json(os.path.join(tmpdir, "ips.json.zip"))
+            assert False, "to_json wrote an uncompressed .zip file"
+        except ValueError as e:
+            assert "only supported for CSV" in str(e)
+        
+        # Suffix-less files are still decompressed when read
+        text_file = os.path.join(tmpdir, "targets")
+        with open_output(text_file, "wb", compression="gzip") as f:
+            f.write(b"192.168.0.1\n10.0.2.0/31\n")
+        assert parse_file(text_file).count() == 3
+        
+        parallel_file = os.path.join(tmpdir, "many.txt.gz")
+        with open_output(parallel_file, "wb", threads=2) as f:
+            parse_cidr("10.1.0.0/20").to_stream(f)
+        assert parse_file(parallel_file).count() == 4096
+        
+        # Parsers report how far into the file on disk they have read
+        from ipgen.parsers import parse_json, parse_text
+        for path, parser in ((os.path.join(tmpdir, "ips.json.gz"), parse_json),
+                             (os.path.join(tmpdir, "ips.json.xz"), parse_json),
+                             (parallel_file, parse_text)):
+            reports = []
+            parsed = parser(path, progress=lambda done, total: reports.append((done, total)))
+            assert parsed.count() == parse_file(path).count()
+            assert reports and reports[-1] == (os.path.getsize(path), os.path.getsize(path))
+        
+        # An exception raised by the callback stops the parse
+        class Stop(Exception):
+            pass
+        
+        def stop(done, total):
+            raise Stop()
+        
+        try:
+            parse_text(parallel_file, progress=stop)
+            assert False, "progress callback did not stop the parse"
+        except Stop:
+            pass
+    
+    # Parallel mode writes independent gzip members that read back as one stream
+    buffer = io.BytesIO()
+    with ParallelGzipWriter(buffer, threads=2, block_size=1024) as f:
+        parse_cidr("10.1.0.0/20").to_stream(f)
+    assert gzip.decompress(buffer.getvalue()).count(b"\n") == 4096
+    assert not buffer.closed
+    print("✓ Compressed files test passed")
+
+def test_ipv6_sweeps():
+    """Test sparse IPv6 generation without expanding whole prefixes."""
+    from ipgen import SubnetSweep
+    
+    sweep = SubnetSweep("2001:db8::/48")
+    assert sweep.count() == 65536 * 255
+    assert str(sweep[0]) == "2001:db8::1"
+    assert str(sweep[255]) == "2001:db8:0:1::1"
+    assert str(sweep[-1]) == "2001:db8:0:ffff::ff"
+    assert "2001:db8:0:7::42" in sweep
+    assert "2001:db8:0:7::" not in sweep
+    
+    # Sweeping every /64 of a /32 has to be asked for explicitly
+    try:
+        SubnetSweep("2001:db8::/32")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    
+    generator = IPGenerator()
+    generator.add_low_byte_hosts("2001:db8:1::/64", last=0x3)
+    generator.add_low_byte_hosts("2001:db8:2::/62", last=0x2)
+    generator.add_eui64("2001:db8:3::/64", ["00:1a:2b"], nics=(0x10, 0x11))
+    generator.add_seed_neighbors(["2001:db8:4::10", "2001:db8:4::12"], radius=1)
+    ips = [str(ip) for ip in generator.generate()]
+    assert generator.count() == len(ips) == 3 + 4 * 2 + 2 + 5
+    assert ips[:3] == ["2001:db8:1::1", "2001:db8:1::2", "2001:db8:1::3"]
+    assert "2001:db8:3:0:21a:2bff:fe00:10" in ips
+    # Single-subnet sweeps and seed windows are plain ranges, ahead of the /62 sweep
+    assert ips[5:10] == ["2001:db8:4::f", "2001:db8:4::10", "2001:db8:4::11",
+                         "2001:db8:4::12", "2001:db8:4::13"]
+    assert ips[-2:] == ["2001:db8:2:3::1", "2001:db8:2:3::2"]
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_file = os.path.join(tmpdir, "sweeps.json")
+        generator.to_json(json_file)
+        assert sorted(str(ip) for ip in parse_json(json_file).generate()) == sorted(ips)
+    print("✓ IPv6 sweep test passed")
+
+def test_pipeline():
+    """Test chaining batch stages between generation and output."""
+    generator = parse_cidr("10.0.0.0/24")
+    generator.add_cidr("10.0.0.0/25")  # overlaps, removed by dedupe
+    generator.add_cidr("192.168.0.0/24")
+    
+    pipeline = (generator.pipeline()
+                .filter_ranges(["192.168.0.0/16"], exclude=True)
+                .filter(lambda ips: ips % 2 == 0, workers=2)
+                .dedupe()
+                .annotate("last_octet", lambda ips: ips & 0xFF))
+    batches = list(pipeline.batches())
+    ips = [int(ip) for batch in batches for ip in batch["ip"]]
+    assert len(ips) == 128
+    assert len(set(ips)) == 128
+    assert batches[0]["last_octet"][:3].tolist() == [0, 2, 4]
+    
+    buffer = io.BytesIO()
+    pipeline.limit(3).to_stream(buffer)
+    assert buffer.getvalue() == b"10.0.0.0\n10.0.0.2\n10.0.0.4\n"
+    
+    # Mixed generators feed each pipeline only its own version
+    generator.add_ip("2001:db8::1")
+    generator.add_range("2001:db8::10", "2001:db8::11")
+    assert generator.pipeline().run() == 256 + 128 + 256
+    ipv6 = [batch["ip"].tolist() for batch in generator.pipeline(version=6).batches()]
+    assert sum(ipv6, []) == [[0x20010db8 << 32, 1], [0x20010db8 << 32, 0x10], [0x20010db8 << 32, 0x11]]
+    
+    # map results are cast back to the address dtype, so exports stay valid
+    import numpy as np
+    generator = parse_cidr("10.0.0.0/30")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        npy_file = os.path.join(tmpdir, "mapped.npy")
+        from ipgen.formatters import to_npy
+        assert to_npy(generator.pipeline().map(lambda ips: ips.astype(np.int64) | 1), npy_file) == 4
+        assert np.load(npy_file).tolist() == [167772161, 167772161, 167772163, 167772163]
+    for func in (lambda ips: ips[:-1], lambda ips: ips.astype(np.int64) - (1 << 40)):
+        try:
+            generator.pipeline().map(func).run()
+            assert False, "map accepted a result that does not fit the addresses"
+        except ValueError:
+            pass
+    print("✓ Pipeline test passed")
+
+def _count_claimed(dispatcher, queue):
+    """Worker for test_dispatcher: report how many addresses were claimed."""
+    queue.put(sum(end - start + 1 for _, start, end in dispatcher.iter_int_ranges()))
+
+def test_dispatcher():
+    """Test handing out addresses to processes through shared memory."""
+    import multiprocessing
+    
+    generator = parse_cidr("10.0.0.0/22")
+    generator.add_ip("2001:db8::1")
+    
+    with generator.share(block_size=100) as dispatcher:
+        assert dispatcher.count() == 1025
+        assert dispatcher.claim() == (0, 100)
+        start = int(ipaddress.IPv4Address("10.0.0.0"))
+        assert list(dispatcher.block_ranges(0, 3)) == [
+            (6, int(ipaddress.IPv6Address("2001:db8::1")), int(ipaddress.IPv6Address("2001:db8::1"))),
+            (4, start, start + 1),
+        ]
+        
+        dispatcher.reset()
+        queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_count_claimed, args=(dispatcher, queue))
+                   for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        claimed = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        assert sum(claimed) == 1025
+        assert dispatcher.claim() is None
+    print("✓ Dispatcher test passed")
+
 def main():
     """Run all tests."""
     print("Running IPGen tests...\n")
@@ -101,8 +838,25 @@ def main():
         test_ip_range()
         test_cidr()
         test_wildcard()
+        test_wildcard_mask()
+        test_bulk_ingestion()
         test_gateway_subnet()
         test_output_formats()
+        test_stream_formats()
+        test_parse_json_streaming()
+        test_yaml_round_trip()
+        test_sql_round_trip()
+        test_columnar_formats()
+        test_contains_many()
+        test_diff()
+        test_interleave()
+        test_parse_many()
+        test_dispatcher()
+        test_pipeline()
+        test_compressed_files()
+        test_ipv6_sweeps()
+        test_gui_summary()
+        test_cli()
         
         print("\nAll tests passed successfully!")
     except AssertionError as e: